@@ -0,0 +1,181 @@
+# ASGI 入口 (FastAPI)：與 app.py 共用同一套問卷邏輯，
+# 但等待 Gemini、LINE API 時不會佔住 worker，可以繼續處理其他使用者的訊息
+#   uvicorn asgi:app --host 0.0.0.0 --port 5000
+import asyncio
+import os
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, PlainTextResponse, Response
+
+import conversation
+import line_api
+import metrics
+import startup
+from decision_tree import get_tree
+from idempotency import make_event_set
+import gemini_client
+from gemini_client import ai_response_async, stream_async
+from image_cache import get_cache
+from image_variants import get_variants
+from job_queue import get_queue
+import rate_limit
+from session_store import make_session_store
+from streaming import SentenceBuffer, push_rest_async, streaming_ai_async
+
+app = FastAPI()
+
+# 啟動時就編譯並檢查問卷資料，有問題直接無法啟動
+get_tree()
+
+# PRELOAD_HEAVY=1 時在背景載入 Gemini、PIL (預設等第一次用到才載入)
+startup.preload()
+
+# 背景工作的執行緒；重啟前留在佇列裡的工作也會被處理
+get_queue().start()
+
+# 每位使用者 (LINE userId) 進行中的問卷狀態
+sessions = make_session_store()
+
+# 已處理過的 webhookEventId，LINE 重送時直接略過
+seen_events = make_event_set()
+
+IMMUTABLE = {'Cache-Control': 'public, max-age=31536000, immutable'}
+
+# 在 webhook 回應之後才繼續執行的工作 (串流回答的後續段落)，保留參照以免被回收
+_background = set()
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+async def delayed_answer(user_id, text, wait):
+    # 限流排隊中的問題：等到保留的名額時間到了再問 Gemini，用 push 送出
+    await asyncio.sleep(wait)
+    if not gemini_client.available():
+        messages = await asyncio.to_thread(
+            conversation.busy_messages, text, notice=conversation.UNAVAILABLE_TEXT)
+        await asyncio.to_thread(line_api.push, user_id, messages)
+    elif gemini_client.STREAM:
+        await push_rest_async(user_id, stream_async(text), SentenceBuffer())
+    else:
+        answer = await ai_response_async(text)
+        await asyncio.to_thread(line_api.push, user_id, [conversation.text_message(answer)])
+
+
+def limited_ai(user_id, ask_ai, after_reply):
+    # 先經過限流再問 Gemini；排隊的問題放進 after_reply，在 reply 之後才開始等
+    # Gemini 斷路中時不佔用限流名額，直接用本機比對的結果回覆
+    # 額度帳本與替代回答 (可能排入圖片下載) 都可能讀寫 SQLite，在 thread 裡執行
+    async def ask(text):
+        if gemini_client.is_cached(text):
+            return await ask_ai(text)
+        if not gemini_client.available():
+            return await asyncio.to_thread(
+                conversation.busy_messages, text, notice=conversation.UNAVAILABLE_TEXT)
+        action, wait = await asyncio.to_thread(rate_limit.get_limiter().admit, user_id)
+        if action == rate_limit.QUEUE:
+            after_reply.append(delayed_answer(user_id, text, wait))
+            return conversation.QUEUED_TEXT.format(seconds=max(1, round(wait)))
+        if action != rate_limit.ALLOW:
+            return await asyncio.to_thread(
+                conversation.busy_messages, text, degrade=action == rate_limit.DEGRADE)
+        return await ask_ai(text)
+    return ask
+
+
+def first_deliveries(events):
+    # 記錄 webhookEventId (可能寫入 SQLite)，回傳第一次收到的事件
+    fresh = []
+    for event in events:
+        if line_api.first_delivery(event, seen_events):
+            fresh.append(event)
+        else:
+            metrics.events.inc('duplicate')
+    return fresh
+
+
+def by_user(events):
+    # 同一位使用者的事件依序處理 (每一步都要讀到上一步寫入的狀態)，不同使用者之間才同時處理
+    groups = {}
+    for event in events:
+        groups.setdefault(event.get('source', {}).get('userId'), []).append(event)
+    return groups.values()
+
+
+async def handle_events(events):
+    for event in events:
+        await handle_event(event)
+
+
+async def handle_event(event):
+    parsed = line_api.text_event(event)
+    if parsed is None:
+        metrics.events.inc('ignored')
+        return
+    user_id, reply_token, text = parsed
+    metrics.events.inc('message')
+
+    # 串流模式下第一段回答跟著 reply 送出，其餘段落在 reply 之後用 push 補上
+    after_reply = []
+    ask_ai = streaming_ai_async(user_id, after_reply) if gemini_client.STREAM else ai_response_async
+    ask_ai = limited_ai(user_id, ask_ai, after_reply)
+
+    # 狀態存在 SQLite / Redis 時讀寫會阻塞，放到 thread 裡執行
+    with metrics.timer('session_get'):
+        state = await asyncio.to_thread(sessions.get, user_id)
+    with metrics.timer('step'):
+        state, messages = await conversation.step_async(state, text, ask_ai=ask_ai)
+    with metrics.timer('session_set'):
+        if state is None:
+            await asyncio.to_thread(sessions.delete, user_id)
+        else:
+            await asyncio.to_thread(sessions.set, user_id, state)
+    # requests 是同步的，放到 thread 裡送出
+    with metrics.timer('reply'):
+        await asyncio.to_thread(line_api.reply, reply_token, messages, user_id)
+    for rest in after_reply:
+        _spawn(rest)
+
+
+@app.post("/")
+async def main(request: Request):
+    with metrics.timer('webhook'):
+        body = await request.body()
+        with metrics.timer('signature'):
+            valid = line_api.verify_signature(body, request.headers.get('X-Line-Signature', ''))
+        if not valid:
+            metrics.events.inc('bad_signature')
+            raise HTTPException(status_code=400)
+        events = await asyncio.to_thread(first_deliveries, line_api.parse_events(body))
+        await asyncio.gather(*(handle_events(group) for group in by_user(events)))
+    return PlainTextResponse('OK')
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+def _send_file(directory, filename, private):
+    path = os.path.join(directory, os.path.basename(filename))
+    if filename == private or filename != os.path.basename(filename) or not os.path.isfile(path):
+        raise HTTPException(status_code=404)
+    return FileResponse(path, headers=IMMUTABLE)
+
+
+@app.get("/images/{filename}")
+async def cached_image(filename: str):
+    return _send_file(get_cache().cache_dir, filename, 'manifest.json')
+
+
+@app.get("/images/v/{filename}")
+async def image_variant(filename: str):
+    return _send_file(get_variants().variant_dir, filename, 'variants.json')
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
@@ -0,0 +1,31 @@
+# 對話狀態、webhook event、每日額度與背景工作共用的儲存工具：
+# 可以選擇存在行程記憶體 (預設) 或多個 worker 行程共用的 SQLite 檔案
+import os
+import sqlite3
+import threading
+
+
+def thread_connection(path, timeout=5, isolation_level=None):
+    # 回傳 conn()：每個執行緒第一次呼叫時各自開一個連線 (sqlite3 的連線不能跨執行緒使用)
+    # WAL 讓讀取不會被其他行程的寫入擋住；synchronous=NORMAL 在 WAL 下仍不會損壞資料庫
+    local = threading.local()
+
+    def conn():
+        c = getattr(local, 'conn', None)
+        if c is None:
+            c = sqlite3.connect(path, timeout=timeout, isolation_level=isolation_level)
+            c.execute('PRAGMA journal_mode=WAL')
+            c.execute('PRAGMA synchronous=NORMAL')
+            local.conn = c
+        return c
+    return conn
+
+
+def make_backend(name, memory, sqlite, default_db):
+    # {name}_BACKEND=memory (預設) 或 sqlite；sqlite 檔案位置由 {name}_DB 指定
+    backend = os.getenv(f'{name}_BACKEND', 'memory')
+    if backend == 'sqlite':
+        return sqlite(os.getenv(f'{name}_DB', default_db))
+    if backend == 'memory':
+        return memory()
+    raise ValueError(f'unknown {name}_BACKEND: {backend}')
@@ -0,0 +1,337 @@
+# 壓力測試：對 webhook 重播簽章過的 LINE 事件，量測延遲、吞吐量與每個 worker 的記憶體
+# LINE API、Gemini、圖片網站都換成本機的 stub server，可以設定各自的延遲
+#   python benchmark.py --target flask --workers 2 --concurrency 32 --conversations 500
+#   python benchmark.py --target asgi --gemini-latency 2000 --json result.json
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import multiprocessing
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import requests
+
+BENCH_SECRET = 'benchmark-channel-secret'
+
+# 自由描述的範例：前幾句本機比對得到，後面的會交給 Gemini
+FREE_TEXT_SAMPLES = [
+    '晚上睡不著，躺很久都無法入睡',
+    '我咳嗽有黃痰，痰很多不好咳出來',
+    '胃酸過多一直火燒心反胃',
+    '眼睛好累',
+    '最近常常覺得頭暈，不知道要吃什麼',
+    '小孩半夜一直哭鬧是怎麼了',
+    '運動後膝蓋痛該怎麼辦',
+    '吃了海鮮之後全身起紅疹',
+]
+
+
+class Counter:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, key):
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+
+def stub_server(handler_class, latency_ms, counter, name, payload=None):
+    # 以 ThreadingHTTPServer 模擬外部服務，每個請求先等 latency_ms
+    class Handler(handler_class):
+        protocol_version = 'HTTP/1.1'
+
+        def respond(self, status, body, content_type):
+            counter.add(name)
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    Handler.payload = payload
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+class LineStub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.respond(200, b'{}', 'application/json')
+
+
+class GeminiStub(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        if ':streamGenerateContent' in self.path:
+            # 串流回應是 JSON array，這裡整個回答放在同一個片段
+            self.respond(200, b'[' + self.payload + b']', 'application/json')
+        else:
+            self.respond(200, self.payload, 'application/json')
+
+
+class ImageStub(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.respond(200, self.payload, 'image/jpeg')
+
+
+def gemini_payload():
+    return json.dumps({
+        'candidates': [{'content': {'parts': [{'text': '建議多休息、多喝水，若症狀持續請就醫。'}], 'role': 'model'},
+                        'finishReason': 'STOP', 'index': 0}],
+        'usageMetadata': {'promptTokenCount': 40, 'candidatesTokenCount': 20, 'totalTokenCount': 60},
+    }, ensure_ascii=False).encode('utf-8')
+
+
+def jpeg_payload():
+    try:
+        from PIL import Image
+    except ImportError:
+        return b'\xff\xd8\xff\xd9'
+    buf = BytesIO()
+    Image.new('RGB', (1200, 800), (46, 125, 50)).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def run_worker(target, port, env):
+    # 在獨立的行程裡啟動一個 worker；圖片網址改指向 stub server
+    os.environ.update(env)
+    import plant_data
+    for i, plant in enumerate(plant_data.image_url):
+        plant_data.image_url[plant] = f"{env['BENCH_IMAGE_BASE']}/{i}.jpg"
+    if target == 'asgi':
+        import uvicorn
+        import asgi
+        uvicorn.run(asgi.app, host='127.0.0.1', port=port, log_level='warning')
+    else:
+        import logging
+        from werkzeug.serving import make_server
+        import app
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        make_server('127.0.0.1', port, app.app, threaded=True).serve_forever()
+
+
+def wait_ready(url, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.post(url, data=b'{}', timeout=1)
+            return True
+        except requests.RequestException:
+            time.sleep(0.2)
+    return False
+
+
+def rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def conversations(rng):
+    # 產生一段對話 (使用者依序送出的文字)，涵蓋所有分類、症狀、描述與 Gemini 後備
+    import plant_data
+    letter = rng.choice([l for l in plant_data.valid_choices if l != 'X'] + ['X'])
+    if letter == 'X':
+        return ['你好', 'X', rng.choice(FREE_TEXT_SAMPLES)]
+    category = plant_data.valid_choices[letter]
+    symptom = rng.choice([s for s in plant_data.Symptom_classification[category]])
+    if symptom == '無':
+        return ['你好', letter, '無', rng.choice(FREE_TEXT_SAMPLES)]
+    if symptom in plant_data.direct_exit_symptoms:
+        return ['你好', letter, symptom]
+    # 還沒有對應植物的症狀或描述會轉為自由描述
+    if symptom not in plant_data.Symptom_questions:
+        return ['你好', letter, symptom, rng.choice(FREE_TEXT_SAMPLES)]
+    option = rng.choice(list(plant_data.Symptom_questions[symptom]))
+    if f'{symptom}_{option}' not in plant_data.Symptom_answers:
+        return ['你好', letter, symptom, option, rng.choice(FREE_TEXT_SAMPLES)]
+    return ['你好', letter, symptom, option]
+
+
+def sign(body):
+    return base64.b64encode(hmac.new(BENCH_SECRET.encode(), body, hashlib.sha256).digest()).decode()
+
+
+def event_body(user_id, text):
+    return json.dumps({'destination': 'bench', 'events': [{
+        'type': 'message',
+        'mode': 'active',
+        'timestamp': int(time.time() * 1000),
+        'webhookEventId': uuid.uuid4().hex,
+        'deliveryContext': {'isRedelivery': False},
+        'replyToken': uuid.uuid4().hex,
+        'source': {'type': 'user', 'userId': user_id},
+        'message': {'id': uuid.uuid4().hex, 'type': 'text', 'text': text},
+    }]}, ensure_ascii=False).encode('utf-8')
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run(args):
+    counter = Counter()
+    servers = [
+        stub_server(LineStub, args.line_latency, counter, 'line'),
+        stub_server(GeminiStub, args.gemini_latency, counter, 'gemini', gemini_payload()),
+        stub_server(ImageStub, args.image_latency, counter, 'image', jpeg_payload()),
+    ]
+    line_url, gemini_url, image_base = (url for _, url in servers)
+
+    workdir = tempfile.mkdtemp(prefix='line-bot-bench-')
+    ctx = multiprocessing.get_context('spawn')
+    workers = []
+    for i in range(args.workers):
+        port = free_port()
+        env = {
+            'LINE_CHANNEL_SECRET': BENCH_SECRET,
+            'CHANNEL_ACCESS_TOKEN': 'benchmark',
+            'GOOGLE_API_KEY': 'benchmark',
+            'LINE_API_URL': line_url,
+            'GEMINI_API_ENDPOINT': gemini_url,
+            'GEMINI_TRANSPORT': 'rest',
+            'BENCH_IMAGE_BASE': image_base,
+            'PUBLIC_BASE_URL': f'http://127.0.0.1:{port}',
+            'KNOWLEDGE_INDEX': os.path.join(workdir, f'knowledge-{i}.idx'),
+            'IMAGE_CACHE_DIR': os.path.join(workdir, f'images-{i}'),
+            'IMAGE_VARIANT_DIR': os.path.join(workdir, f'variants-{i}'),
+            'JOB_QUEUE_DB': os.path.join(workdir, f'jobs-{i}.db'),
+        }
+        proc = ctx.Process(target=run_worker, args=(args.target, port, env), daemon=True)
+        proc.start()
+        workers.append((proc, f'http://127.0.0.1:{port}/'))
+    for proc, url in workers:
+        if not wait_ready(url):
+            sys.exit(f'worker {url} did not start')
+    idle_rss = {proc.pid: rss_mb(proc.pid) for proc, _ in workers}
+
+    rng = random.Random(args.seed)
+    plans = [(f'Ubench{i:06d}', conversations(rng)) for i in range(args.conversations)]
+    latencies = [[] for _ in workers]
+    errors = Counter()
+    local = threading.local()
+
+    def play(n):
+        user_id, texts = plans[n]
+        w = n % len(workers)
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        for text in texts:
+            body = event_body(user_id, text)
+            start = time.perf_counter()
+            try:
+                r = session.post(workers[w][1], data=body, timeout=30,
+                                 headers={'X-Line-Signature': sign(body), 'Content-Type': 'application/json'})
+                if r.status_code != 200:
+                    errors.add(r.status_code)
+            except requests.RequestException as e:
+                errors.add(type(e).__name__)
+                continue
+            latencies[w].append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.concurrency) as pool:
+        list(pool.map(play, range(len(plans))))
+    elapsed = time.perf_counter() - start
+    # 讓背景工作 (Gemini、圖片下載) 有時間跑完再量記憶體
+    time.sleep(args.settle)
+
+    all_latencies = sorted(x for xs in latencies for x in xs)
+    result = {
+        'target': args.target,
+        'workers': args.workers,
+        'concurrency': args.concurrency,
+        'requests': len(all_latencies),
+        'errors': errors.counts,
+        'elapsed_s': round(elapsed, 3),
+        'throughput_rps': round(len(all_latencies) / elapsed, 1),
+        'latency_ms': {p: round(percentile(all_latencies, p), 2) for p in (50, 95, 99)},
+        'per_worker': [{
+            'pid': proc.pid,
+            'requests': len(latencies[i]),
+            'throughput_rps': round(len(latencies[i]) / elapsed, 1),
+            'p99_ms': round(percentile(sorted(latencies[i]), 99), 2),
+            'rss_idle_mb': idle_rss[proc.pid] and round(idle_rss[proc.pid], 1),
+            'rss_mb': rss_mb(proc.pid) and round(rss_mb(proc.pid), 1),
+        } for i, (proc, _) in enumerate(workers)],
+        'stub_calls': counter.counts,
+    }
+
+    for proc, _ in workers:
+        proc.terminate()
+    for server, _ in servers:
+        server.shutdown()
+    return result
+
+
+def report(result):
+    lat = result['latency_ms']
+    print(f"target {result['target']}: {result['workers']} worker(s), concurrency {result['concurrency']}")
+    print(f"{result['requests']} requests in {result['elapsed_s']}s, {result['throughput_rps']} req/s, "
+          f"errors {result['errors'] or 0}")
+    print(f"latency p50 {lat[50]} ms, p95 {lat[95]} ms, p99 {lat[99]} ms")
+    for w in result['per_worker']:
+        print(f"  worker {w['pid']}: {w['requests']} requests, {w['throughput_rps']} req/s, "
+              f"p99 {w['p99_ms']} ms, RSS {w['rss_idle_mb']} -> {w['rss_mb']} MB")
+    print('stub calls:', ', '.join(f'{k} {v}' for k, v in sorted(result['stub_calls'].items())))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='LINE bot 壓力測試')
+    parser.add_argument('--target', choices=['flask', 'asgi'], default='flask')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--concurrency', type=int, default=16, help='同時進行的模擬使用者數')
+    parser.add_argument('--conversations', type=int, default=300, help='模擬的對話數 (每段 3~4 則訊息)')
+    parser.add_argument('--line-latency', type=float, default=20, help='LINE API stub 延遲 (ms)')
+    parser.add_argument('--gemini-latency', type=float, default=800, help='Gemini stub 延遲 (ms)')
+    parser.add_argument('--image-latency', type=float, default=200, help='圖片網站 stub 延遲 (ms)')
+    parser.add_argument('--settle', type=float, default=1.0, help='結束後等待背景工作的秒數')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='另外把結果寫成 JSON 檔')
+    args = parser.parse_args(argv)
+
+    result = run(args)
+    report(result)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# 外部服務 (Gemini、圖片網站) 的斷路器
+# closed：正常呼叫，並以每秒一格的滾動視窗統計錯誤與過慢的呼叫；比例超過門檻就 open
+# open：冷卻期間所有呼叫立刻丟出 CircuitOpen，呼叫端改用替代回答，執行緒不會卡在已經掛掉的服務上
+# half_open：冷卻結束後只放行少量探測呼叫，成功就回到 closed，失敗或太慢就再 open
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import metrics
+
+WINDOW = int(os.getenv('BREAKER_WINDOW', '30'))                 # 秒
+MIN_CALLS = int(os.getenv('BREAKER_MIN_CALLS', '5'))            # 視窗內至少幾次呼叫才判斷
+ERROR_RATE = float(os.getenv('BREAKER_ERROR_RATE', '0.5'))
+SLOW_RATE = float(os.getenv('BREAKER_SLOW_RATE', '0.5'))
+COOLDOWN = float(os.getenv('BREAKER_COOLDOWN', '30'))           # 秒
+PROBES = int(os.getenv('BREAKER_PROBES', '1'))                  # half_open 時同時放行幾個呼叫
+
+CLOSED = 'closed'
+HALF_OPEN = 'half_open'
+OPEN = 'open'
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpen(RuntimeError):
+    pass
+
+
+class _Call:
+    def __init__(self):
+        self.started = time.monotonic()
+
+    def start(self):
+        # 從這裡重新計時，例如取得並行名額之後：排隊等待的時間不算在外部服務的延遲裡
+        self.started = time.monotonic()
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+
+class CircuitBreaker:
+    def __init__(self, name, slow_seconds, window=WINDOW, min_calls=MIN_CALLS, error_rate=ERROR_RATE,
+                 slow_rate=SLOW_RATE, cooldown=COOLDOWN, probes=PROBES):
+        self.name = name
+        self.slow_seconds = slow_seconds
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.cooldown = cooldown
+        self.probes = probes
+        self.state = CLOSED
+        self._buckets = deque()     # [秒, 呼叫數, 失敗數, 過慢數]
+        self._opened_at = 0.0
+        self._probing = 0
+        self._lock = threading.Lock()
+        metrics.circuit_state.set(0, name)
+
+    def _set_state(self, state):
+        self.state = state
+        metrics.circuit_state.set(STATE_VALUES[state], self.name)
+        if state != CLOSED:
+            metrics.circuit_transitions.inc(self.name, state)
+
+    def _trip(self, now):
+        self._opened_at = now
+        self._probing = 0
+        self._set_state(OPEN)
+
+    def available(self):
+        # 只看狀態、不改變狀態：open 且還在冷卻中時回傳 False
+        return self.state != OPEN or time.monotonic() - self._opened_at >= self.cooldown
+
+    def allow(self):
+        now = time.monotonic()
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN:
+                if now - self._opened_at < self.cooldown:
+                    metrics.circuit_rejected.inc(self.name)
+                    return False
+                self._probing = 0
+                self._set_state(HALF_OPEN)
+            if self._probing < self.probes:
+                self._probing += 1
+                return True
+            metrics.circuit_rejected.inc(self.name)
+            return False
+
+    def record(self, ok, elapsed):
+        now = time.monotonic()
+        slow = elapsed >= self.slow_seconds
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = max(0, self._probing - 1)
+                if ok and not slow:
+                    self._buckets.clear()
+                    self._set_state(CLOSED)
+                else:
+                    self._trip(now)
+                return
+            if self.state == OPEN:
+                return
+            second = int(now)
+            if not self._buckets or self._buckets[-1][0] != second:
+                self._buckets.append([second, 0, 0, 0])
+            bucket = self._buckets[-1]
+            bucket[1] += 1
+            bucket[2] += not ok
+            bucket[3] += slow
+            while self._buckets[0][0] <= second - self.window:
+                self._buckets.popleft()
+            calls = sum(b[1] for b in self._buckets)
+            if calls < self.min_calls:
+                return
+            failures = sum(b[2] for b in self._buckets)
+            slows = sum(b[3] for b in self._buckets)
+            if failures >= calls * self.error_rate or slows >= calls * self.slow_rate:
+                self._trip(now)
+
+    def release(self):
+        # 呼叫被取消 (不是服務的問題)：不計入統計，只歸還探測名額
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = max(0, self._probing - 1)
+
+    @contextmanager
+    def guard(self):
+        # with breaker.guard() as call: 呼叫外部服務
+        # 斷路時丟出 CircuitOpen；區塊內丟出例外算失敗，執行時間超過 slow_seconds 算過慢
+        # (從進入區塊或最後一次 call.start() 開始算)
+        if not self.allow():
+            raise CircuitOpen(self.name)
+        call = _Call()
+        try:
+            yield call
+        except (GeneratorExit, asyncio.CancelledError):
+            self.release()
+            raise
+        except BaseException:
+            self.record(False, call.elapsed())
+            raise
+        self.record(True, call.elapsed())
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, slow_seconds):
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name, slow_seconds)
+    return breaker
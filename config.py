@@ -0,0 +1,12 @@
+# 讀取 KEY.env.ini 與環境變數中的金鑰設定
+import os
+from dotenv import load_dotenv
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 環境變數優先，KEY.env.ini 只補上沒有設定的值
+load_dotenv(os.path.join(BASE_DIR, 'KEY.env.ini'))
+
+GOOGLE_API_KEY = os.getenv('GOOGLE_API_KEY', '').strip()
+CHANNEL_ACCESS_TOKEN = os.getenv('CHANNEL_ACCESS_TOKEN', '').strip()
+LINE_CHANNEL_SECRET = os.getenv('LINE_CHANNEL_SECRET', '').strip()
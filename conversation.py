@@ -0,0 +1,191 @@
+# 問卷對話引擎：每則訊息只推進使用者一步 (種類 → 症狀 → 描述 → 植物)
+# 對話狀態由呼叫端保存，這裡不做任何 I/O
+
+import asyncio
+
+import decision_tree
+from decision_tree import get_tree
+from image_cache import get_cache
+from image_variants import get_variants
+from knowledge_index import get_index, NO_PLANT
+import metrics
+import payloads
+from payloads import get_payloads
+from plant_cards import get_cards
+from symptom_matcher import get_matcher
+
+# 任何階段輸入這些字都會回到主選單
+restart_words = ['選單', '重新開始', '開始']
+
+NO_AI_TEXT = "抱歉，我無法回答這個問題，請諮詢專業醫生。"
+BUSY_TEXT = "目前詢問的人數較多，請稍後再試，或輸入「選單」透過問卷查詢。"
+QUEUED_TEXT = "目前詢問的人數較多，已為您排隊，大約 {seconds} 秒後回覆。"
+UNAVAILABLE_TEXT = "AI 諮詢暫時無法使用，請稍後再試，或輸入「選單」透過問卷查詢。"
+
+# Gemini 超過流量限制時，本機比對改用較寬鬆的門檻
+DEGRADED_MATCH_THRESHOLD = 0.15
+
+
+def text_message(text):
+    return {'type': 'text', 'text': text}
+
+
+def image_message(url, preview_url=None):
+    return {'type': 'image', 'originalContentUrl': url, 'previewImageUrl': preview_url or url}
+
+
+def plant_image_message(url):
+    # 優先使用預先縮好的圖，其次是快取的原圖，最後才是原網址；
+    # 原網站斷路中且沒有可用的快取時回傳 None
+    with metrics.timer('image'):
+        urls = get_variants().urls(url)
+        metrics.cache_result('image_variant', urls is not None)
+        if urls is not None:
+            return image_message(*urls)
+        public = get_cache().public_url(url)
+        return None if public is None else image_message(public)
+
+
+def prompt_key(node):
+    # 決策樹節點 -> payloads 裡對應的提示訊息與輸入錯誤訊息
+    if node.kind == decision_tree.MENU:
+        return payloads.MENU, payloads.CATEGORY_ERROR_NODE
+    if node.kind == decision_tree.CATEGORY:
+        return (payloads.SYMPTOMS, node.ref), (payloads.SYMPTOM_ERROR_NODE, node.ref)
+    if node.kind == decision_tree.SYMPTOM:
+        return (payloads.DESCRIPTIONS, node.ref), (payloads.DESCRIPTION_ERROR, node.ref)
+    return payloads.FREE_TEXT, payloads.FREE_TEXT
+
+
+def new_state(node_id):
+    # 記下產生這個狀態時的 payload 版本，資料更新後舊的節點 ID 不會被誤用
+    return {'node': node_id, 'v': get_payloads().version}
+
+
+def go(node_id):
+    # 移到某個節點：葉節點直接回覆植物並結束問卷，其他節點回覆該節點的提示
+    node = get_tree()[node_id]
+    if node.kind == decision_tree.CATEGORY:
+        metrics.category_requests.inc(get_index().categories[node.ref])
+    if node.kind == decision_tree.PLANT:
+        metrics.plant_answers.inc(get_index().plants[node.ref], 'questionnaire')
+        return None, plant_messages(node.ref)
+    return new_state(node_id), [get_payloads()[prompt_key(node)[0]]]
+
+
+def menu():
+    return go(get_tree().root)
+
+
+def plant_messages(plant_id):
+    index = get_index()
+    card = get_cards().get(index.plants[plant_id])
+    image = plant_image_message(index.plant_images[plant_id])
+    # 沒有圖片時只送文字的卡片
+    return [card.title, *([image] if image is not None else []), *card.full]
+
+
+def matched_messages(match):
+    # 本機比對到的結果，先說明是依哪個症狀描述推薦的
+    index = get_index()
+    metrics.symptom_requests.inc(index.symptoms[match.symptom])
+    metrics.plant_answers.inc(index.plants[match.plant], 'matcher')
+    reason = index.symptoms[match.symptom]
+    if match.description != NO_PLANT:
+        reason += "：" + index.descriptions[match.description][2]
+    return [text_message(f"根據您的描述，較符合「{reason}」")] + plant_messages(match.plant)
+
+
+def matched_reply(match):
+    # 比對到植物時直接推薦；只比對到症狀名稱或分類時進入問卷的那一步，讓使用者自己選
+    if match.plant != NO_PLANT:
+        return None, matched_messages(match)
+    tree = get_tree()
+    if match.symptom is not None:
+        metrics.symptom_requests.inc(get_index().symptoms[match.symptom])
+        return go(tree.symptom_nodes[match.symptom])
+    return go(tree.category_nodes[match.category])
+
+
+def busy_messages(text, degrade=True, notice=BUSY_TEXT):
+    # 不能問 Gemini 時的替代回答：放寬門檻用本機比對，比對不到就請使用者稍後再試或改用問卷
+    # 這個回答之後問卷已經結束，只接受有對應植物的結果
+    if degrade:
+        match = get_matcher().match(text, threshold=DEGRADED_MATCH_THRESHOLD, plant_only=True)
+        if match is not None:
+            return matched_messages(match)
+    return [text_message(notice)]
+
+
+def ai_messages(answer):
+    # ask_ai 可以回傳文字，或已經組好的訊息 list (例如 busy_messages())
+    return answer if isinstance(answer, list) else [text_message(answer)]
+
+
+def current_node(state):
+    # 沒有進行中的問卷，或狀態是舊版本資料產生的，都回傳 None
+    if not state or state.get('v') != get_payloads().version:
+        return None
+    return state.get('node')
+
+
+def shortcut(state, text):
+    # 任何狀態下都優先處理的輸入，沒有時回傳 None
+    if text in restart_words:
+        return menu()
+    # 點選植物說明的段落時只回該段落，不影響進行中的問卷
+    section = get_cards().section_for(text)
+    if section is not None:
+        return state, [section]
+    return None
+
+
+def step(state, text, ask_ai=None):
+    # state 為 None 代表沒有進行中的問卷；回傳 (新狀態, 要回覆的訊息)
+    # 新狀態為 None 代表問卷結束，呼叫端可以刪除該使用者的狀態
+    text = text.strip()
+    reply = shortcut(state, text)
+    if reply is not None:
+        return reply
+
+    tree = get_tree()
+    node_id = current_node(state)
+    if node_id is None:
+        # 沒有進行中的問卷時，描述夠明確就直接推薦，否則顯示主選單
+        match = get_matcher().match(text)
+        if match is not None:
+            return matched_reply(match)
+        return menu()
+
+    if node_id == tree.free_text:
+        # 先用本機比對，比對不到才交給 Gemini
+        match = get_matcher().match(text)
+        if match is not None:
+            return matched_reply(match)
+        if ask_ai is None:
+            return None, [text_message(NO_AI_TEXT)]
+        return None, ai_messages(ask_ai(text))
+
+    next_id = tree.next(node_id, text)
+    if next_id is None:
+        return state, [get_payloads()[prompt_key(tree[node_id])[1]]]
+    if tree[node_id].kind == decision_tree.CATEGORY and next_id != tree.free_text:
+        metrics.symptom_requests.inc(text)
+    return go(next_id)
+
+
+async def step_async(state, text, ask_ai=None):
+    # 與 step() 相同，但 ask_ai 是 coroutine function，等待 Gemini 時不會卡住 event loop；
+    # 會回覆植物的步驟 (圖片還沒快取時排入背景下載，寫入 SQLite) 在 thread 裡執行
+    text = text.strip()
+    reply = shortcut(state, text)
+    if reply is not None:
+        return reply
+    if current_node(state) != get_tree().free_text:
+        return await asyncio.to_thread(step, state, text)
+    match = get_matcher().match(text)
+    if match is not None:
+        return await asyncio.to_thread(matched_reply, match)
+    if ask_ai is None:
+        return None, [text_message(NO_AI_TEXT)]
+    return None, ai_messages(await ask_ai(text))
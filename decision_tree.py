@@ -0,0 +1,149 @@
+# 問卷決策樹：把 plant_data 的各個表格編譯成一棵驗證過的樹
+# 啟動時只要有一條邊指向不存在的症狀、描述或植物就直接丟出 TreeError，
+# 執行時每一步都是一次字典查詢，不會再出現 KeyError 或無限重新輸入
+# 還沒有對應植物的症狀或描述 (資料尚未補齊) 不是錯誤：選到時跟「無」一樣轉為自由描述
+from collections import namedtuple
+
+from knowledge_index import get_index, NO_PLANT
+from monograph_store import get_store
+
+# 節點種類
+MENU = 'menu'
+CATEGORY = 'category'         # ref = 分類 ID，顯示該分類的症狀
+SYMPTOM = 'symptom'           # ref = 症狀 ID，顯示該症狀的描述選項
+PLANT = 'plant'               # ref = 植物 ID，葉節點
+FREE_TEXT = 'free_text'       # 請使用者自由描述，交給本機比對或 Gemini
+
+# 在分類選單或症狀選單輸入這些字會轉為自由描述
+FREE_TEXT_INPUTS = {MENU: ['X', 'x'], CATEGORY: ['沒有', '無']}
+
+Node = namedtuple('Node', 'kind ref')
+
+
+class TreeError(ValueError):
+    pass
+
+
+def validate_tables(data):
+    # 檢查 plant_data 各表格之間的參照，回傳警告 (不影響執行的問題)，有錯誤時丟出 TreeError
+    errors = []
+    warnings = []
+    listed = set()
+    for letter, name in data.valid_choices.items():
+        if letter != 'X' and name not in data.Symptom_classification:
+            errors.append(f"valid_choices[{letter!r}] -> unknown category {name!r}")
+    for category, symptoms in data.Symptom_classification.items():
+        for symptom in symptoms:
+            if symptom == '無':
+                continue
+            listed.add(symptom)
+            if symptom in data.direct_exit_symptoms:
+                continue
+            if symptom not in data.Symptom_questions:
+                warnings.append(f"{category} lists {symptom!r}, which has no questions and no direct answer (goes to free text)")
+    for symptom in data.direct_exit_symptoms:
+        if symptom not in data.single_choice:
+            errors.append(f"direct exit {symptom!r} has no single_choice answer")
+        if symptom not in listed:
+            errors.append(f"direct exit {symptom!r} is not listed in any category")
+    for symptom, options in data.Symptom_questions.items():
+        for letter in options:
+            if f"{symptom}_{letter}" not in data.Symptom_answers:
+                warnings.append(f"{symptom}_{letter} has no Symptom_answers entry (goes to free text)")
+        if symptom not in listed:
+            warnings.append(f"{symptom!r} has questions but is not listed in any category (reachable only by free text)")
+    for key in data.Symptom_answers:
+        symptom, _, letter = key.rpartition('_')
+        if letter not in data.Symptom_questions.get(symptom, {}):
+            errors.append(f"Symptom_answers[{key!r}] has no matching question")
+    for plant in list(data.Symptom_answers.values()) + list(data.single_choice.values()):
+        if plant not in data.image_url:
+            errors.append(f"plant {plant!r} has no image_url")
+    for symptom in data.single_choice:
+        if symptom not in data.direct_exit_symptoms:
+            warnings.append(f"single_choice {symptom!r} is not a direct exit symptom")
+    if errors:
+        raise TreeError('invalid questionnaire data:\n  ' + '\n  '.join(dict.fromkeys(errors)))
+    return warnings
+
+
+class DecisionTree:
+    def __init__(self, index, store):
+        missing = [p for p in index.plants if p not in store]
+        if missing:
+            raise TreeError('plants without monographs: ' + ', '.join(missing))
+
+        self.nodes = [Node(MENU, None), Node(FREE_TEXT, None)]
+        self.edges = {}     # (節點 ID, 輸入文字) -> 節點 ID
+        self.root = 0
+        self.free_text = 1
+        self.category_nodes = {}    # 分類 ID -> 節點 ID
+        self.symptom_nodes = {}     # 需要選擇描述的症狀 ID -> 節點 ID
+
+        plant_nodes = {}
+
+        def node(kind, ref):
+            if kind == PLANT and ref in plant_nodes:
+                return plant_nodes[ref]
+            self.nodes.append(Node(kind, ref))
+            if kind == PLANT:
+                plant_nodes[ref] = len(self.nodes) - 1
+            return len(self.nodes) - 1
+
+        for text in FREE_TEXT_INPUTS[MENU]:
+            self.edges[self.root, text] = self.free_text
+
+        symptom_nodes = self.symptom_nodes
+        for letter, category in index.category_by_letter.items():
+            cat_node = self.category_nodes[category] = node(CATEGORY, category)
+            self.edges[self.root, letter] = cat_node
+            self.edges[self.root, letter.lower()] = cat_node
+            for text in FREE_TEXT_INPUTS[CATEGORY]:
+                self.edges[cat_node, text] = self.free_text
+            for symptom in index.category_symptoms[category]:
+                plant = index.symptom_plant[symptom]
+                if plant != NO_PLANT:
+                    self.edges[cat_node, index.symptoms[symptom]] = node(PLANT, plant)
+                    continue
+                if not index.symptom_descriptions[symptom]:
+                    self.edges[cat_node, index.symptoms[symptom]] = self.free_text
+                    continue
+                if symptom not in symptom_nodes:
+                    symptom_nodes[symptom] = node(SYMPTOM, symptom)
+                    for d in index.symptom_descriptions[symptom]:
+                        plant = index.answer(d)
+                        leaf = self.free_text if plant == NO_PLANT else node(PLANT, plant)
+                        letter = index.descriptions[d][1]
+                        self.edges[symptom_nodes[symptom], letter] = leaf
+                        self.edges[symptom_nodes[symptom], letter.lower()] = leaf
+                self.edges[cat_node, index.symptoms[symptom]] = symptom_nodes[symptom]
+
+        # 每個非葉節點都必須有出路，否則使用者會被困在重新輸入的迴圈裡
+        for node_id, n in enumerate(self.nodes):
+            if n.kind in (MENU, CATEGORY, SYMPTOM) and not any(src == node_id for src, _ in self.edges):
+                raise TreeError(f'{n.kind} node {n.ref!r} has no way out')
+
+    def next(self, node_id, text):
+        # 回傳下一個節點 ID；輸入不在選項裡時回傳 None
+        return self.edges.get((node_id, text))
+
+    def __getitem__(self, node_id):
+        return self.nodes[node_id]
+
+
+_tree = None
+
+
+def get_tree():
+    global _tree
+    if _tree is None:
+        _tree = DecisionTree(get_index(), get_store())
+    return _tree
+
+
+if __name__ == '__main__':
+    import plant_data
+    for warning in validate_tables(plant_data):
+        print('warning:', warning)
+    tree = get_tree()
+    print(f'{len(tree.nodes)} nodes, {len(tree.edges)} edges')
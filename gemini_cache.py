@@ -0,0 +1,143 @@
+# Gemini 自由描述回答的快取
+# 第一層：正規化後文字的雜湊完全相同；
+# 第二層：中文字 bigram 的 Dice 相似度超過門檻 (例如「頭很痛又一直咳嗽該怎麼辦」與「頭很痛又一直咳嗽該怎麼辦呢」)
+# 相似的字面可能是完全不同的問題 (「有發燒」與「沒有發燒」、「我」與「小孩」)，
+# 所以兩邊的否定詞與對象詞必須完全相同、長度也要接近，才算相似命中
+import hashlib
+import os
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+CACHE_TTL = int(os.getenv('GEMINI_CACHE_TTL', str(24 * 3600)))
+CACHE_MAX = int(os.getenv('GEMINI_CACHE_MAX', '5000'))
+SIMILARITY = float(os.getenv('GEMINI_CACHE_SIMILARITY', '0.85'))    # 設成 1 以上等於只用第一層
+LENGTH_RATIO = 0.8      # 較短的文字至少要是較長的幾成
+
+# 出現次數不同就代表意思可能相反或問的是別人
+NEGATION_WORDS = ('不', '沒', '無', '非', '別', '未', '勿', '免', '禁', '忌')
+SUBJECT_WORDS = ('我', '小孩', '孩子', '兒童', '兒子', '女兒', '嬰', '寶寶', '幼兒', '孕', '哺乳', '餵奶',
+                 '老人', '長輩', '爸', '媽', '阿公', '阿嬤', '爺爺', '奶奶', '先生', '太太', '老公', '老婆',
+                 '朋友', '家人', '狗', '貓', '寵物')
+GUARD_WORDS = NEGATION_WORDS + SUBJECT_WORDS
+
+
+def normalize(text):
+    # 全形轉半形、英文轉小寫，去掉空白與標點
+    text = unicodedata.normalize('NFKC', text).lower()
+    return ''.join(ch for ch in text if unicodedata.category(ch)[0] not in 'PZSC')
+
+
+def guard_signature(normalized):
+    return tuple(normalized.count(word) for word in GUARD_WORDS)
+
+
+def ngrams(text, n=2):
+    if len(text) < n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class ResponseCache:
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX, similarity=SIMILARITY):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self._entries = OrderedDict()   # 雜湊 -> (到期時間, bigram 集合, 回答, 正規化文字)
+        self._postings = {}             # bigram -> 含有它的雜湊集合
+        self._lock = threading.Lock()
+        self.hits = {'exact': 0, 'similar': 0}
+        self.misses = 0
+
+    @staticmethod
+    def key(normalized):
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    def get(self, text):
+        # 回傳 (回答, 'exact' 或 'similar')，沒有命中時回傳 None
+        normalized = normalize(text)
+        if not normalized:
+            return None
+        key = self.key(normalized)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits['exact'] += 1
+                    return entry[2], 'exact'
+                self._remove(key)
+
+            grams = ngrams(normalized)
+            signature = guard_signature(normalized)
+            shared = {}
+            for gram in grams:
+                for other in self._postings.get(gram, ()):
+                    shared[other] = shared.get(other, 0) + 1
+            best, best_score = None, 0.0
+            for other, count in shared.items():
+                score = 2 * count / (len(grams) + len(self._entries[other][1]))
+                if score > best_score and self._comparable(normalized, signature, self._entries[other][3]):
+                    best, best_score = other, score
+            if best is not None and best_score >= self.similarity:
+                entry = self._entries[best]
+                if entry[0] > now:
+                    self._entries.move_to_end(best)
+                    self.hits['similar'] += 1
+                    return entry[2], 'similar'
+                self._remove(best)
+            self.misses += 1
+            return None
+
+    def put(self, text, answer):
+        normalized = normalize(text)
+        if not normalized:
+            return
+        key = self.key(normalized)
+        grams = ngrams(normalized)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, grams, answer, normalized)
+            for gram in grams:
+                self._postings.setdefault(gram, set()).add(key)
+            self._evict()
+
+    @staticmethod
+    def _comparable(normalized, signature, other):
+        if min(len(normalized), len(other)) < LENGTH_RATIO * max(len(normalized), len(other)):
+            return False
+        return signature == guard_signature(other)
+
+    def _remove(self, key):
+        grams = self._entries.pop(key)[1]
+        for gram in grams:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def _evict(self):
+        # 先清掉最久沒用且已過期的，再依 LRU 刪到容量以內
+        now = time.monotonic()
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry[0] > now and len(self._entries) <= self.max_entries:
+                break
+            self._remove(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,395 @@
+# Google Gemini 用戶端：整個行程只設定一次金鑰，模型依設定快取重複使用，
+# 並限制同時進行的 generate_content 數量
+# google.generativeai 載入要將近一秒，等到第一次真的要呼叫 Gemini 時才 import
+import asyncio
+import logging
+import os
+import threading
+import time
+from datetime import timedelta
+from functools import lru_cache
+
+import config
+import metrics
+from circuit_breaker import get_breaker
+from gemini_cache import get_cache, normalize
+from rate_limit import get_ledger
+from single_flight import AsyncSingleFlight, SingleFlight
+
+MODEL_NAME = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+MAX_CONCURRENCY = int(os.getenv('GEMINI_MAX_CONCURRENCY', '8'))
+REQUEST_TIMEOUT = float(os.getenv('GEMINI_TIMEOUT', '30'))
+# 一次呼叫 (串流則是整個回答) 超過幾秒算過慢；過慢或出錯的比例太高時斷路，改用本機的替代回答
+SLOW_SECONDS = float(os.getenv('GEMINI_SLOW_SECONDS', '20'))
+# 'rest' 走 HTTP keep-alive 連線，'grpc' 則共用同一個 channel；都是設定一次後重複使用
+TRANSPORT = os.getenv('GEMINI_TRANSPORT') or None
+# 指向其他 API 位址 (例如 benchmark 的本機 stub server)
+API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT') or None
+# 串流模式：邊生成邊把已完成的句子送給使用者
+STREAM = os.getenv('GEMINI_STREAM', '1') not in ('', '0')
+
+SYSTEM_INSTRUCTION = (
+    "你是一個專業的醫療輔助機器人，只能回答與醫療相關的問題。"
+    "請根據你的知識，提供準確、簡潔、符合醫療建議的回答。"
+    "如果問題超出你的專業範圍，請回答「抱歉，我無法回答這個問題，請諮詢專業醫生。」"
+)
+
+# 設定 Gemini 文字生成參數
+DEFAULT_GENERATION = dict(max_output_tokens=2048, temperature=0.2, top_p=0.5, top_k=16)
+
+# 依問題類型選擇生成參數：一般的症狀詢問只需要簡短的建議 (輸出上限小、延遲短)，
+# 問到原理、比較或要求詳細說明時才給較長的回答
+PROFILES = {
+    'triage': dict(max_output_tokens=int(os.getenv('GEMINI_TRIAGE_TOKENS', '512'))),
+    'detailed': dict(max_output_tokens=int(os.getenv('GEMINI_DETAILED_TOKENS', '2048'))),
+}
+PROFILE_INSTRUCTIONS = {
+    'triage': "請用三到五句話回答：可能的原因、居家照護建議，以及什麼情況應該就醫。",
+    'detailed': "請分點詳細說明，必要時解釋原理並比較不同的做法。",
+}
+DETAILED_WORDS = ('為什麼', '原理', '詳細', '解釋', '說明', '比較', '差別', '差異', '機制', '副作用')
+DETAILED_CHARS = 150            # 描述很長的問題也用 detailed
+PROFILE = os.getenv('GEMINI_PROFILE') or None    # 指定後所有問題都用同一組參數
+
+# 使用者輸入最多送出幾個 token，超過時刪掉中間的部分
+MAX_INPUT_TOKENS = int(os.getenv('GEMINI_MAX_INPUT_TOKENS', '400'))
+# 把固定的 system instruction 存成 Gemini 的 cached content (模型與長度需符合 context caching 的條件)
+CONTEXT_CACHE = os.getenv('GEMINI_CONTEXT_CACHE', '') not in ('', '0')
+CONTEXT_CACHE_TTL = int(os.getenv('GEMINI_CONTEXT_CACHE_TTL', '3600'))
+
+NO_ANSWER_TEXT = "抱歉，我無法理解你的問題，請換個方式問問看～"
+ERROR_TEXT = "Gemini 執行出錯，請稍後再試！"
+
+log = logging.getLogger(__name__)
+
+_configure_lock = threading.Lock()
+_configured = False
+genai = None
+_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+# 斷路器在 _slots 之前檢查：Gemini 掛掉時請求立刻失敗，不會排隊佔住 worker 執行緒；
+# 延遲則從取得 _slots 之後才開始算，尖峰時排隊等名額不會被當成 Gemini 太慢
+_breaker = get_breaker('gemini', SLOW_SECONDS)
+# 相同的問題 (正規化後相同) 同時只問 Gemini 一次；stream 與一般呼叫各自一組
+_flights = SingleFlight('gemini')
+_stream_flights = SingleFlight('gemini_stream')
+_async_flights = AsyncSingleFlight('gemini')
+_async_stream_flights = AsyncSingleFlight('gemini_stream')
+
+
+def configure():
+    global _configured, genai
+    if _configured:
+        return
+    with _configure_lock:
+        if not _configured:
+            import google.generativeai
+            genai = google.generativeai
+            client_options = {'api_endpoint': API_ENDPOINT} if API_ENDPOINT else None
+            genai.configure(api_key=config.GOOGLE_API_KEY, transport=TRANSPORT, client_options=client_options)
+            _configured = True
+
+
+@lru_cache(maxsize=32)
+def get_model(model_name=MODEL_NAME, system_instruction=SYSTEM_INSTRUCTION, **generation):
+    # 相同參數共用同一個 GenerativeModel；generation 必須是可雜湊的值
+    configure()
+    generation_config = genai.types.GenerationConfig(**{**DEFAULT_GENERATION, **generation})
+    return genai.GenerativeModel(
+        model_name=model_name,
+        generation_config=generation_config,
+        system_instruction=system_instruction,
+    )
+
+
+_context_lock = threading.Lock()
+_context_models = {}    # profile -> (GenerativeModel, 到期時間)；False 代表不支援
+
+
+def context_cached_model(profile):
+    # 以 cached content 保存 system instruction，之後每次請求只送使用者的問題；
+    # 模型不支援或內容太短而建立失敗時回傳 None，改用一般模型，之後不再嘗試
+    entry = _context_models.get(profile)
+    if entry is False:
+        return None
+    if entry is not None and entry[1] > time.time():
+        return entry[0]
+    with _context_lock:
+        entry = _context_models.get(profile)
+        if entry is False:
+            return None
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+        configure()
+        try:
+            content = genai.caching.CachedContent.create(
+                model=MODEL_NAME,
+                system_instruction=SYSTEM_INSTRUCTION + PROFILE_INSTRUCTIONS[profile],
+                ttl=timedelta(seconds=CONTEXT_CACHE_TTL),
+            )
+            model = genai.GenerativeModel.from_cached_content(
+                content, generation_config=genai.types.GenerationConfig(**{**DEFAULT_GENERATION, **PROFILES[profile]}))
+        except Exception as e:
+            log.warning('Gemini context cache unavailable for %s: %s', profile, e)
+            _context_models[profile] = False
+            return None
+        # 提早一分鐘換新，避免用到剛過期的 cached content
+        _context_models[profile] = (model, time.time() + CONTEXT_CACHE_TTL - 60)
+        return model
+
+
+def profile_model(profile):
+    if CONTEXT_CACHE:
+        model = context_cached_model(profile)
+        if model is not None:
+            return model
+    return get_model(system_instruction=SYSTEM_INSTRUCTION + PROFILE_INSTRUCTIONS[profile], **PROFILES[profile])
+
+
+def choose_profile(text):
+    if PROFILE in PROFILES:
+        return PROFILE
+    if len(text) >= DETAILED_CHARS or any(word in text for word in DETAILED_WORDS):
+        return 'detailed'
+    return 'triage'
+
+
+def compact(text, model):
+    # 合併多餘的空白；太長時先呼叫 count_tokens 確認，再保留開頭與結尾、刪掉中間
+    # 中文大約一個字一個 token 以內，字數不超過上限時就不必多一次 API 呼叫
+    text = ' '.join(text.split())
+    if len(text) <= MAX_INPUT_TOKENS:
+        return text
+    try:
+        tokens = model.count_tokens(text, request_options={'timeout': REQUEST_TIMEOUT}).total_tokens
+    except Exception:
+        tokens = len(text)
+    if tokens <= MAX_INPUT_TOKENS:
+        return text
+    keep = int(len(text) * MAX_INPUT_TOKENS / tokens * 0.95)
+    head = keep * 2 // 3
+    metrics.gemini_trimmed.inc()
+    return text[:head] + '…' + text[len(text) - (keep - head):]
+
+
+def prepare(detailed_input):
+    # 回傳 (profile, 模型, 實際送出的文字)
+    profile = choose_profile(detailed_input)
+    model = profile_model(profile)
+    return profile, model, compact(detailed_input, model)
+
+
+def record_usage(profile, usage):
+    # 每次呼叫的 token 用量，從 /metrics 可以看到各 profile 的成本與輸出長度，並記入每日額度
+    get_ledger().record(calls=1, tokens=usage.total_token_count if usage else 0)
+    if not usage:
+        return
+    metrics.gemini_tokens.inc(profile, 'prompt', amount=usage.prompt_token_count)
+    metrics.gemini_tokens.inc(profile, 'output', amount=usage.candidates_token_count)
+    metrics.gemini_tokens.inc(profile, 'cached', amount=getattr(usage, 'cached_content_token_count', 0))
+    metrics.gemini_output_tokens.observe(usage.candidates_token_count, profile)
+
+
+def available():
+    # False 代表斷路中，呼叫 Gemini 會立刻丟出 CircuitOpen
+    return _breaker.available()
+
+
+def generate(text, model=None, profile='custom'):
+    with _breaker.guard() as call:
+        if model is None:
+            profile, model, text = prepare(text)
+        with _slots, metrics.timer('gemini'):
+            call.start()
+            response = model.generate_content(text, request_options={'timeout': REQUEST_TIMEOUT})
+    record_usage(profile, getattr(response, 'usage_metadata', None))
+    return response
+
+
+_async_slots = {}
+
+
+def _loop_slots():
+    loop = asyncio.get_running_loop()
+    slots = _async_slots.get(loop)
+    if slots is None:
+        slots = _async_slots[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return slots
+
+
+async def generate_async(text, model=None, profile='custom'):
+    # asyncio 版本：每個 event loop 各自一個 Semaphore
+    if TRANSPORT == 'rest':
+        # REST transport 沒有 async 版本，改在 thread 裡呼叫同步的 API
+        return await asyncio.to_thread(generate, text, model, profile)
+    with _breaker.guard() as call:
+        if model is None:
+            profile, model, text = await asyncio.to_thread(prepare, text)
+        async with _loop_slots():
+            with metrics.timer('gemini'):
+                call.start()
+                response = await model.generate_content_async(text, request_options={'timeout': REQUEST_TIMEOUT})
+    # 額度帳本可能是 SQLite，不在 event loop 上寫入
+    await asyncio.to_thread(record_usage, profile, getattr(response, 'usage_metadata', None))
+    return response
+
+
+def _chunk_text(chunk):
+    # 被安全設定擋下的片段 (或回答) 沒有文字，.text 會丟出 ValueError
+    try:
+        return chunk.text
+    except ValueError:
+        return ''
+
+
+def _stream_uncached(detailed_input, model=None):
+    # 前一個相同的問題可能剛好生成完，再查一次快取
+    cached = get_cache().get(detailed_input)
+    if cached is not None:
+        yield cached[0]
+        return
+    parts = []
+    usage = None
+    with _breaker.guard() as call:
+        profile, model, prompt = prepare(detailed_input) if model is None else ('custom', model, detailed_input)
+        with _slots, metrics.timer('gemini'):
+            call.start()
+            start = time.perf_counter()
+            response = model.generate_content(prompt, stream=True, request_options={'timeout': REQUEST_TIMEOUT})
+            for chunk in response:
+                # 用量只在最後一個片段是完整的
+                usage = getattr(chunk, 'usage_metadata', None) or usage
+                text = _chunk_text(chunk)
+                if not text:
+                    continue
+                if not parts:
+                    metrics.stage_seconds.observe(time.perf_counter() - start, 'gemini_first_chunk')
+                parts.append(text)
+                yield text
+    record_usage(profile, usage)
+    if not parts:
+        yield NO_ANSWER_TEXT
+        return
+    get_cache().put(detailed_input, ''.join(parts))
+
+
+async def _stream_uncached_async(detailed_input):
+    cached = get_cache().get(detailed_input)
+    if cached is not None:
+        yield cached[0]
+        return
+    parts = []
+    usage = None
+    with _breaker.guard() as call:
+        profile, model, prompt = await asyncio.to_thread(prepare, detailed_input)
+        async with _loop_slots():
+            with metrics.timer('gemini'):
+                call.start()
+                start = time.perf_counter()
+                response = await model.generate_content_async(
+                    prompt, stream=True, request_options={'timeout': REQUEST_TIMEOUT})
+                async for chunk in response:
+                    usage = getattr(chunk, 'usage_metadata', None) or usage
+                    text = _chunk_text(chunk)
+                    if not text:
+                        continue
+                    if not parts:
+                        metrics.stage_seconds.observe(time.perf_counter() - start, 'gemini_first_chunk')
+                    parts.append(text)
+                    yield text
+    await asyncio.to_thread(record_usage, profile, usage)
+    if not parts:
+        yield NO_ANSWER_TEXT
+        return
+    get_cache().put(detailed_input, ''.join(parts))
+
+
+def cached_answer(detailed_input):
+    # 快取裡的答案 (沒有時回傳 None)，不會呼叫 Gemini
+    cached = get_cache().get(detailed_input)
+    metrics.cache_result('gemini', cached is not None)
+    return None if cached is None else cached[0]
+
+
+def stream(detailed_input, model=None):
+    # 逐段產生回答文字；命中快取時一次產生整個回答，沒有任何文字時產生 NO_ANSWER_TEXT
+    # 同時有相同的問題正在生成時，直接共用那一個 stream
+    cached = cached_answer(detailed_input)
+    if cached is not None:
+        yield cached
+        return
+    if model is not None:
+        yield from _stream_uncached(detailed_input, model)
+        return
+    yield from _stream_flights.stream(normalize(detailed_input), _stream_uncached, detailed_input)
+
+
+async def stream_async(detailed_input):
+    # asyncio 版本的 stream()
+    if TRANSPORT == 'rest':
+        # REST transport 沒有 async 版本，在 thread 裡一段一段讀同步的 stream
+        chunks = stream(detailed_input)
+        while True:
+            text = await asyncio.to_thread(next, chunks, None)
+            if text is None:
+                return
+            yield text
+    cached = cached_answer(detailed_input)
+    if cached is not None:
+        yield cached
+        return
+    async for text in _async_stream_flights.stream(normalize(detailed_input), _stream_uncached_async, detailed_input):
+        yield text
+
+
+def is_cached(detailed_input):
+    # 快取裡已經有答案時不會呼叫 Gemini，不必經過限流
+    return get_cache().get(detailed_input) is not None
+
+
+def _answer_uncached(detailed_input):
+    cached = get_cache().get(detailed_input)
+    if cached is not None:
+        return cached[0]
+    # 被安全設定擋下或沒有內容的回答每次都會一樣，不丟出例外 (背景工作才不會一直重試)
+    text = _chunk_text(generate(detailed_input))
+    if not text:
+        return NO_ANSWER_TEXT
+    # 只快取正常的回答，錯誤訊息不快取
+    get_cache().put(detailed_input, text)
+    return text
+
+
+async def _answer_uncached_async(detailed_input):
+    cached = get_cache().get(detailed_input)
+    if cached is not None:
+        return cached[0]
+    text = _chunk_text(await generate_async(detailed_input))
+    if not text:
+        return NO_ANSWER_TEXT
+    get_cache().put(detailed_input, text)
+    return text
+
+
+def answer(detailed_input):
+    # 與 ai_response() 相同，但 Gemini 出錯時直接丟出例外，讓背景工作可以重試
+    cached = cached_answer(detailed_input)
+    if cached is not None:
+        return cached
+    return _flights.do(normalize(detailed_input), _answer_uncached, detailed_input)
+
+
+def ai_response(detailed_input):
+    try:
+        return answer(detailed_input)
+    except Exception:
+        return ERROR_TEXT
+
+
+async def ai_response_async(detailed_input):
+    cached = cached_answer(detailed_input)
+    if cached is not None:
+        return cached
+    try:
+        return await _async_flights.do(normalize(detailed_input), _answer_uncached_async, detailed_input)
+    except Exception:
+        return ERROR_TEXT
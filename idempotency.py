@@ -0,0 +1,72 @@
+# webhook event 去重：同一個 webhookEventId 在時間窗內只處理一次
+# add() 的語意同 Redis 的 SET key NX EX window，成功代表第一次看到
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from backends import make_backend, thread_connection
+
+EVENT_WINDOW = int(os.getenv('IDEMPOTENCY_WINDOW', str(24 * 3600)))   # 秒
+EVENT_MAX = int(os.getenv('IDEMPOTENCY_MAX', '200000'))
+SWEEP_EVERY = 256
+
+
+class MemoryEventSet:
+    # OrderedDict 依加入時間排序，過期或超過上限的從最前面刪
+    def __init__(self, window=EVENT_WINDOW, max_events=EVENT_MAX):
+        self.window = window
+        self.max_events = max_events
+        self._events = OrderedDict()   # event id -> 到期時間
+        self._lock = threading.Lock()
+
+    def add(self, event_id):
+        now = time.monotonic()
+        with self._lock:
+            expires = self._events.get(event_id)
+            if expires is not None and expires > now:
+                return False
+            self._events.pop(event_id, None)
+            self._events[event_id] = now + self.window
+            while self._events:
+                oldest, expires = next(iter(self._events.items()))
+                if expires > now and len(self._events) <= self.max_events:
+                    break
+                del self._events[oldest]
+            return True
+
+    def __len__(self):
+        return len(self._events)
+
+
+class SQLiteEventSet:
+    # 多個 worker 行程共用同一個檔案時，也能去除彼此收到的重複 event
+    def __init__(self, path, window=EVENT_WINDOW):
+        self.path = path
+        self.window = window
+        self._conn = thread_connection(path)
+        self._adds = 0
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS events (event_id TEXT PRIMARY KEY, expires REAL NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS events_expires ON events (expires)')
+
+    def add(self, event_id):
+        now = time.time()
+        conn = self._conn()
+        # 已過期的同一個 id 視為新的 event
+        inserted = conn.execute(
+            'INSERT INTO events (event_id, expires) VALUES (?, ?) '
+            'ON CONFLICT (event_id) DO UPDATE SET expires = excluded.expires WHERE events.expires <= ?',
+            (event_id, now + self.window, now)).rowcount
+        self._adds += 1
+        if self._adds % SWEEP_EVERY == 0:
+            conn.execute('DELETE FROM events WHERE expires <= ?', (now,))
+        return bool(inserted)
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+
+def make_event_set():
+    # IDEMPOTENCY_BACKEND=memory (預設) 或 sqlite；sqlite 檔案位置由 IDEMPOTENCY_DB 指定
+    return make_backend('IDEMPOTENCY', MemoryEventSet, SQLiteEventSet, 'events.db')
@@ -0,0 +1,255 @@
+# 植物圖片的本機快取
+# 圖片以內容的 sha256 命名存放，manifest.json 記錄來源網址與 ETag/Last-Modified，
+# 回覆時指向我們自己的 /images/ 網址，請求處理中不會去外部網站下載
+# 多個 worker 行程共用同一個目錄：下載可能由任何一個行程的背景工作完成，
+# manifest.json 改變時 (mtime 不同) 重新讀取；寫入時以檔案鎖保護，先讀入最新內容再修改
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+
+from circuit_breaker import CircuitOpen, get_breaker
+from job_queue import get_queue, register
+import metrics
+from plant_data import image_url
+from single_flight import SingleFlight
+
+try:
+    import fcntl
+except ImportError:     # Windows：沒有檔案鎖，只適合單一行程
+    fcntl = None
+
+CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_cache'))
+CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', str(200 * 1024 * 1024)))
+PUBLIC_BASE_URL = os.getenv('PUBLIC_BASE_URL', '').rstrip('/')
+FETCH_TIMEOUT = float(os.getenv('IMAGE_FETCH_TIMEOUT', '10'))
+SLOW_SECONDS = float(os.getenv('IMAGE_SLOW_SECONDS', '5'))    # 下載超過幾秒算過慢
+REFETCH_AFTER = 600     # 背景下載失敗後，多久之後可以再排一次
+
+USER_AGENT = 'flask-line-bot image cache'
+
+
+def host_breaker(url):
+    # 每個圖片網站各自一個斷路器，一個網站掛掉不影響其他網站的圖片
+    return get_breaker('image:' + urlsplit(url).netloc, SLOW_SECONDS)
+
+
+class ImageCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, base_url=PUBLIC_BASE_URL):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.base_url = base_url
+        self.manifest_path = os.path.join(cache_dir, 'manifest.json')
+        self._mtime = None
+        self._lock = threading.Lock()
+        self._pending = {}    # 網址 -> 排入背景下載的時間
+        self._flights = SingleFlight('image')
+        self._session = requests.Session()
+        self._session.headers['User-Agent'] = USER_AGENT
+        os.makedirs(cache_dir, exist_ok=True)
+        self.manifest = self._load_manifest()     # 來源網址 -> 快取資訊
+
+    def _load_manifest(self):
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+            with open(self.manifest_path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        self._mtime = mtime
+        return manifest
+
+    def _refresh(self):
+        # 其他行程寫入過 manifest.json 時重新讀取
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != self._mtime:
+            with self._lock:
+                self.manifest = self._load_manifest()
+
+    @contextmanager
+    def _update_manifest(self):
+        # with self._update_manifest() as manifest: 修改 manifest，結束時寫回
+        # 持有檔案鎖的期間先讀入最新的內容，不會蓋掉其他行程剛加入的項目
+        with self._lock, open(self.manifest_path + '.lock', 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            self.manifest = self._load_manifest()
+            yield self.manifest
+            tmp = self.manifest_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+            os.replace(tmp, self.manifest_path)
+            self._mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def entry(self, url):
+        self._refresh()
+        return self.manifest.get(url)
+
+    def path(self, filename):
+        return os.path.join(self.cache_dir, filename)
+
+    def lookup(self, url):
+        # 只查本機，不連網路；有快取時回傳檔名並更新 LRU 的使用時間
+        entry = self.entry(url)
+        if entry is None:
+            return None
+        path = self.path(entry['file'])
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return entry['file']
+
+    def public_url(self, url):
+        # 回覆給 LINE 用的網址；還沒有快取時先用原網址，並在背景下載
+        # 原網站斷路中又沒辦法用自己的網址時回傳 None (LINE 也抓不到那張圖)，由呼叫端改送純文字
+        filename = self.lookup(url)
+        metrics.cache_result('image', filename is not None)
+        if filename is not None and self.base_url:
+            return f'{self.base_url}/images/{filename}'
+        if not host_breaker(url).available():
+            return None
+        if filename is None:
+            self.fetch_in_background(url)
+        return url
+
+    def fetch_in_background(self, url):
+        # 交給背景工作佇列下載 (失敗會重試)；同一個網址短時間內只排一次
+        now = time.monotonic()
+        with self._lock:
+            if now - self._pending.get(url, -REFETCH_AFTER) < REFETCH_AFTER:
+                return
+            self._pending[url] = now
+        get_queue().enqueue('image_fetch', {'url': url})
+
+    def fetch(self, url, revalidate=False):
+        # 下載 (或用 ETag/Last-Modified 重新驗證) 一張圖片，回傳快取檔名
+        # 同一個網址同時只會有一個下載，其他呼叫等它完成後共用結果
+        entry = self.entry(url)
+        if entry is not None and not revalidate and self.lookup(url):
+            return entry['file']
+        return self._flights.do(url, self._download, url, revalidate)
+
+    def _download(self, url, revalidate):
+        # 等待期間可能剛好有另一個下載完成，再檢查一次
+        entry = self.entry(url)
+        if entry is not None and not revalidate and self.lookup(url):
+            return entry['file']
+
+        headers = {}
+        if entry is not None and os.path.exists(self.path(entry['file'])):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        # 斷路中直接丟出 CircuitOpen，背景工作稍後重試；4xx 是網址的問題，不計入網站的錯誤率
+        with host_breaker(url).guard(), metrics.timer('image_fetch'):
+            r = self._session.get(url, headers=headers, timeout=FETCH_TIMEOUT)
+            if r.status_code >= 500:
+                r.raise_for_status()
+        if r.status_code == 304 and entry is not None:
+            os.utime(self.path(entry['file']))
+            with self._update_manifest() as manifest:
+                if url in manifest:
+                    manifest[url]['checked'] = time.time()
+            return entry['file']
+        r.raise_for_status()
+
+        content_type = r.headers.get('Content-Type', '').split(';')[0].strip()
+        ext = mimetypes.guess_extension(content_type) or '.img'
+        if ext == '.jpe':
+            ext = '.jpg'
+        digest = hashlib.sha256(r.content).hexdigest()
+        filename = digest + ext
+        path = self.path(filename)
+        if not os.path.exists(path):
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(r.content)
+            os.replace(tmp, path)
+        else:
+            os.utime(path)
+
+        with self._update_manifest() as manifest:
+            manifest[url] = {
+                'file': filename,
+                'sha256': digest,
+                'content_type': content_type,
+                'size': len(r.content),
+                'etag': r.headers.get('ETag'),
+                'last_modified': r.headers.get('Last-Modified'),
+                'checked': time.time(),
+            }
+            self._evict()
+        return filename
+
+    def _evict(self):
+        # 超過容量時依最後使用時間 (mtime) 刪除最舊的檔案
+        files = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            if name.startswith('manifest.json') or name.endswith('.tmp'):
+                continue
+            st = os.stat(self.path(name))
+            files.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+        files.sort()
+        removed = set()
+        while files and total > self.max_bytes:
+            _, size, name = files.pop(0)
+            os.remove(self.path(name))
+            removed.add(name)
+            total -= size
+        if removed:
+            for url in [u for u, e in self.manifest.items() if e['file'] in removed]:
+                del self.manifest[url]
+
+    def prewarm(self, revalidate=True):
+        # 部署時先把所有植物圖片抓下來
+        ok = 0
+        for plant, url in image_url.items():
+            try:
+                filename = self.fetch(url, revalidate=revalidate)
+                print(f'{plant}: {filename}')
+                ok += 1
+            except (requests.RequestException, CircuitOpen) as e:
+                print(f'{plant}: failed ({e})')
+        return ok
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = ImageCache()
+    return _cache
+
+
+def image_fetch_job(payload):
+    get_cache().fetch(payload['url'])
+
+
+register('image_fetch', image_fetch_job)
+
+
+if __name__ == '__main__':
+    # python image_cache.py prewarm
+    if sys.argv[1:] != ['prewarm']:
+        print('usage: python image_cache.py prewarm')
+        sys.exit(2)
+    ok = get_cache().prewarm()
+    print(f'{ok}/{len(image_url)} images cached in {CACHE_DIR}')
+    sys.exit(0 if ok == len(image_url) else 1)
@@ -0,0 +1,135 @@
+# 預先產生 LINE 圖片訊息用的兩種尺寸：
+# previewImageUrl 用小圖、originalContentUrl 用最長邊 1024px 的圖，
+# 各輸出 progressive JPEG (給 LINE) 與 WebP，檔名為內容的 sha256
+# 回覆時只查 manifest，PIL 等到真的要轉檔時才載入
+import hashlib
+import json
+import os
+import sys
+import threading
+from io import BytesIO
+
+from image_cache import get_cache
+from plant_data import image_url
+from single_flight import SingleFlight
+
+VARIANT_DIR = os.getenv('IMAGE_VARIANT_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'image_variants'))
+
+# 名稱 -> (最長邊像素, JPEG 品質)
+SIZES = {
+    'preview': (240, 70),
+    'full': (1024, 82),
+}
+VARIANT_VERSION = 1
+
+
+def _encode(img, fmt, quality):
+    buf = BytesIO()
+    if fmt == 'jpeg':
+        img.save(buf, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        img.save(buf, 'WEBP', quality=quality, method=6)
+    return buf.getvalue()
+
+
+class ImageVariants:
+    def __init__(self, variant_dir=VARIANT_DIR, base_url=None):
+        self.variant_dir = variant_dir
+        self.manifest_path = os.path.join(variant_dir, 'variants.json')
+        self._lock = threading.Lock()
+        self._flights = SingleFlight('image_variant')
+        os.makedirs(variant_dir, exist_ok=True)
+        try:
+            with open(self.manifest_path, encoding='utf-8') as f:
+                self.manifest = json.load(f)   # 原圖 sha256 -> {'preview': 檔名, 'full': 檔名, ...}
+        except (OSError, ValueError):
+            self.manifest = {}
+        self.base_url = get_cache().base_url if base_url is None else base_url
+
+    def _save_manifest(self):
+        tmp = self.manifest_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.manifest_path)
+
+    def _write(self, data, ext):
+        filename = hashlib.sha256(data).hexdigest() + ext
+        path = os.path.join(self.variant_dir, filename)
+        if not os.path.exists(path):
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        return filename
+
+    def build(self, source_path, source_sha):
+        # 同一張原圖只轉一次，同時有多個請求時也只有一個在轉檔
+        entry = self.manifest.get(source_sha)
+        if entry is not None and entry.get('version') == VARIANT_VERSION:
+            return entry
+        return self._flights.do(source_sha, self._build, source_path, source_sha)
+
+    def _build(self, source_path, source_sha):
+        entry = self.manifest.get(source_sha)
+        if entry is not None and entry.get('version') == VARIANT_VERSION:
+            return entry
+        from PIL import Image
+        with Image.open(source_path) as img:
+            img = img.convert('RGB')
+            entry = {'version': VARIANT_VERSION}
+            for name, (edge, quality) in SIZES.items():
+                resized = img.copy()
+                resized.thumbnail((edge, edge), Image.LANCZOS)
+                entry[name] = self._write(_encode(resized, 'jpeg', quality), '.jpg')
+                entry[name + '_webp'] = self._write(_encode(resized, 'webp', quality), '.webp')
+        with self._lock:
+            self.manifest[source_sha] = entry
+            self._save_manifest()
+        return entry
+
+    def build_url(self, url):
+        cache = get_cache()
+        filename = cache.fetch(url)
+        return self.build(cache.path(filename), cache.entry(url)['sha256'])
+
+    def urls(self, url):
+        # 回傳 (originalContentUrl, previewImageUrl)；還沒產生縮圖時回傳 None
+        entry = get_cache().entry(url)
+        if entry is None or not self.base_url:
+            return None
+        variants = self.manifest.get(entry['sha256'])
+        if variants is None:
+            return None
+        return (f"{self.base_url}/images/v/{variants['full']}",
+                f"{self.base_url}/images/v/{variants['preview']}")
+
+    def build_all(self):
+        ok = 0
+        for plant, url in image_url.items():
+            try:
+                entry = self.build_url(url)
+            except Exception as e:
+                print(f'{plant}: failed ({e})')
+                continue
+            sizes = {name: os.path.getsize(os.path.join(self.variant_dir, entry[name]))
+                     for name in entry if name != 'version'}
+            print(f'{plant}: ' + ', '.join(f'{name} {size / 1024:.1f}KB' for name, size in sizes.items()))
+            ok += 1
+        return ok
+
+
+_variants = None
+
+
+def get_variants():
+    global _variants
+    if _variants is None:
+        _variants = ImageVariants()
+    return _variants
+
+
+if __name__ == '__main__':
+    # python image_variants.py：下載 (或沿用快取的) 原圖並產生所有縮圖
+    ok = get_variants().build_all()
+    print(f'{ok}/{len(image_url)} plants processed into {VARIANT_DIR}')
+    sys.exit(0 if ok == len(image_url) else 1)
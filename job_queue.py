@@ -0,0 +1,176 @@
+# 存在 SQLite 的背景工作佇列，搭配執行緒池處理較慢的回覆 (Gemini、下載圖片)
+# 同一個 webhook event 只會排入一次；失敗時以指數退避重試
+# 多個 worker 行程可以共用同一個檔案：執行中的工作超過 LEASE 秒沒有更新才視為行程已經結束，
+# 由其他行程重新領取；每個行程只領取自己有註冊處理函式的工作
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import traceback
+
+import metrics
+from backends import thread_connection
+
+QUEUE_DB = os.getenv('JOB_QUEUE_DB', 'jobs.db')
+WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '4'))
+RETRY_BASE = float(os.getenv('JOB_RETRY_BASE', '2'))    # 秒，第 n 次重試等 RETRY_BASE * 2**(n-1)
+KEEP_DONE = 24 * 3600                                     # 完成的工作保留多久 (用於去除重複的 event)
+LEASE = float(os.getenv('JOB_LEASE', '300'))             # 秒，必須比最慢的工作還長
+POLL_INTERVAL = 1.0
+
+# kind -> (處理函式, 最後一次失敗時呼叫的函式)
+_handlers = {}
+
+
+def register(kind, handler, on_failure=None):
+    _handlers[kind] = (handler, on_failure)
+
+
+class JobQueue:
+    def __init__(self, path=QUEUE_DB, workers=WORKERS):
+        self.path = path
+        self.workers = workers
+        self._conn = thread_connection(path, timeout=10)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._start_lock = threading.Lock()
+        with self._conn() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                'dedup_key TEXT UNIQUE, '
+                'kind TEXT NOT NULL, '
+                'payload TEXT NOT NULL, '
+                "status TEXT NOT NULL DEFAULT 'queued', "
+                'attempts INTEGER NOT NULL DEFAULT 0, '
+                'run_at REAL NOT NULL, '
+                'updated REAL NOT NULL, '
+                'last_error TEXT)')
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_at)')
+
+    def enqueue(self, kind, payload, dedup_key=None, delay=0):
+        # 回傳 False 代表相同 dedup_key 的工作已經排過了
+        now = time.time()
+        cur = self._conn().execute(
+            'INSERT OR IGNORE INTO jobs (dedup_key, kind, payload, run_at, updated) VALUES (?, ?, ?, ?, ?)',
+            (dedup_key, kind, json.dumps(payload, ensure_ascii=False), now + delay, now))
+        if cur.rowcount:
+            self.start()
+            self._wake.set()
+        return bool(cur.rowcount)
+
+    def _claim(self):
+        # 到期的工作，或是領取後超過 LEASE 沒有完成的工作 (執行它的行程已經重啟或當掉)
+        conn = self._conn()
+        now = time.time()
+        kinds = list(_handlers)
+        marks = ','.join('?' * len(kinds))
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT id, kind, payload, attempts FROM jobs '
+                f"WHERE (status = 'queued' AND run_at <= ? OR status = 'running' AND updated < ?) AND kind IN ({marks}) "
+                'ORDER BY run_at LIMIT 1', (now, now - LEASE, *kinds)).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated = ? WHERE id = ?",
+                    (now, row[0]))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def _finish(self, job_id, status, error=None, run_at=None):
+        now = time.time()
+        self._conn().execute(
+            'UPDATE jobs SET status = ?, last_error = ?, run_at = COALESCE(?, run_at), updated = ? WHERE id = ?',
+            (status, error, run_at, now, job_id))
+
+    def run_one(self):
+        # 執行一個到期的工作，沒有工作時回傳 False
+        row = self._claim()
+        if row is None:
+            return False
+        job_id, kind, payload, attempts = row
+        attempts += 1
+        payload = json.loads(payload)
+        handler, on_failure = _handlers.get(kind, (None, None))
+        if handler is None:
+            self._finish(job_id, 'failed', f'no handler for {kind}')
+            return True
+        try:
+            with metrics.timer('job_' + kind):
+                handler(payload)
+        except Exception:
+            error = traceback.format_exc(limit=3)
+            if attempts >= MAX_ATTEMPTS:
+                metrics.jobs.inc(kind, 'failed')
+                self._finish(job_id, 'failed', error)
+                if on_failure is not None:
+                    try:
+                        on_failure(payload)
+                    except Exception:
+                        traceback.print_exc()
+            else:
+                metrics.jobs.inc(kind, 'retry')
+                backoff = RETRY_BASE * 2 ** (attempts - 1) * random.uniform(0.8, 1.2)
+                self._finish(job_id, 'queued', error, time.time() + backoff)
+            return True
+        metrics.jobs.inc(kind, 'done')
+        self._finish(job_id, 'done')
+        return True
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                if self.run_one():
+                    continue
+            except sqlite3.Error:
+                traceback.print_exc()
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+
+    def start(self):
+        # 伺服器啟動時呼叫，之前留在檔案裡的工作不必等到有新工作排入才開始處理
+        if self._threads:
+            return
+        with self._start_lock:
+            if self._threads:
+                return
+            self.cleanup()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._worker, name=f'job-worker-{i}', daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        for t in self._threads:
+            t.join()
+        self._threads = []
+
+    def cleanup(self):
+        self._conn().execute(
+            "DELETE FROM jobs WHERE status IN ('done', 'failed') AND updated < ?", (time.time() - KEEP_DONE,))
+
+    def counts(self):
+        return dict(self._conn().execute('SELECT status, COUNT(*) FROM jobs GROUP BY status').fetchall())
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue()
+    return _queue
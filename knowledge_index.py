@@ -0,0 +1,184 @@
+# 把 plant_data 的各個字典編譯成以整數 ID 互相對應的唯讀索引
+# 請求處理時只需要查陣列，不需要再用 f"{type_input}_{final_input}" 組字串
+# 索引可以存成 marshal 快照，worker 啟動時直接載入，不必重新編譯
+import hashlib
+import marshal
+import os
+import sys
+
+INDEX_VERSION = 2
+INDEX_PATH = os.getenv('KNOWLEDGE_INDEX', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'knowledge.idx'))
+SOURCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'plant_data.py')
+
+NO_PLANT = -1
+
+
+def source_digest(path=SOURCE_PATH):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def compile_tables(data):
+    # data 為 plant_data 模組 (或具有相同屬性的物件)，回傳只含 tuple/int/str 的字典，可直接 marshal
+    # 先檢查表格之間的參照，有問題就在啟動時丟出 TreeError
+    from decision_tree import validate_tables
+    validate_tables(data)
+
+    categories = tuple(data.Symptom_classification)
+    category_ids = {name: i for i, name in enumerate(categories)}
+
+    symptoms = []
+    symptom_ids = {}
+
+    def symptom_id(name):
+        if name not in symptom_ids:
+            symptom_ids[name] = len(symptoms)
+            symptoms.append(name)
+        return symptom_ids[name]
+
+    category_symptoms = tuple(
+        tuple(symptom_id(s) for s in data.Symptom_classification[c] if s != '無')
+        for c in categories)
+    for name in data.Symptom_questions:
+        symptom_id(name)
+    for name in data.single_choice:
+        symptom_id(name)
+
+    plants = tuple(data.image_url)
+    plant_ids = {name: i for i, name in enumerate(plants)}
+
+    descriptions = []          # (symptom_id, 代號, 描述文字)
+    description_plant = []
+    symptom_descriptions = [() for _ in symptoms]
+    for name, options in data.Symptom_questions.items():
+        sid = symptom_ids[name]
+        ids = []
+        for letter, text in options.items():
+            ids.append(len(descriptions))
+            descriptions.append((sid, letter, text))
+            plant = data.Symptom_answers.get(f"{name}_{letter}")
+            description_plant.append(plant_ids[plant] if plant is not None else NO_PLANT)
+        symptom_descriptions[sid] = tuple(ids)
+
+    # 直接給答案的症狀 (direct_exit_symptoms)
+    symptom_plant = [NO_PLANT] * len(symptoms)
+    for name in data.direct_exit_symptoms:
+        if name in symptom_ids and name in data.single_choice:
+            symptom_plant[symptom_ids[name]] = plant_ids[data.single_choice[name]]
+
+    # 反向對應：植物 → 會推薦它的症狀 / 症狀描述
+    plant_symptoms = [[] for _ in plants]
+    plant_descriptions = [[] for _ in plants]
+    for did, pid in enumerate(description_plant):
+        if pid != NO_PLANT:
+            plant_descriptions[pid].append(did)
+            sid = descriptions[did][0]
+            if sid not in plant_symptoms[pid]:
+                plant_symptoms[pid].append(sid)
+    for sid, pid in enumerate(symptom_plant):
+        if pid != NO_PLANT and sid not in plant_symptoms[pid]:
+            plant_symptoms[pid].append(sid)
+
+    return {
+        'version': INDEX_VERSION,
+        'categories': categories,
+        'category_letters': tuple((letter, category_ids[name]) for letter, name in data.valid_choices.items()
+                                  if name in category_ids),
+        'category_symptoms': category_symptoms,
+        'symptoms': tuple(symptoms),
+        'descriptions': tuple(descriptions),
+        'symptom_descriptions': tuple(symptom_descriptions),
+        'description_plant': tuple(description_plant),
+        'symptom_plant': tuple(symptom_plant),
+        'plants': plants,
+        'plant_images': tuple(data.image_url.get(p, '') for p in plants),
+        'plant_symptoms': tuple(tuple(x) for x in plant_symptoms),
+        'plant_descriptions': tuple(tuple(x) for x in plant_descriptions),
+    }
+
+
+class KnowledgeIndex:
+    def __init__(self, tables):
+        if tables.get('version') != INDEX_VERSION:
+            raise ValueError('knowledge index version mismatch')
+        self.tables = tables
+        self.categories = tables['categories']
+        self.category_symptoms = tables['category_symptoms']
+        self.symptoms = tables['symptoms']
+        self.descriptions = tables['descriptions']
+        self.symptom_descriptions = tables['symptom_descriptions']
+        self.description_plant = tables['description_plant']
+        self.symptom_plant = tables['symptom_plant']
+        self.plants = tables['plants']
+        self.plant_images = tables['plant_images']
+        self.plant_symptoms = tables['plant_symptoms']
+        self.plant_descriptions = tables['plant_descriptions']
+
+        # 以下是由上面的陣列推導出來的查詢表，載入時建立
+        self.category_by_letter = dict(tables['category_letters'])
+        self.symptom_ids = {name: i for i, name in enumerate(self.symptoms)}
+        self.plant_ids = {name: i for i, name in enumerate(self.plants)}
+        self.category_members = tuple(frozenset(ids) for ids in self.category_symptoms)
+        self.description_by_letter = tuple(
+            {self.descriptions[d][1]: d for d in ids} for ids in self.symptom_descriptions)
+
+    def answer(self, description_id):
+        # 症狀描述 → 植物 ID，沒有對應時為 NO_PLANT
+        return self.description_plant[description_id]
+
+    def dumps(self, digest=''):
+        return marshal.dumps((digest, self.tables))
+
+    @classmethod
+    def loads(cls, blob, digest=None):
+        stored_digest, tables = marshal.loads(blob)
+        if digest is not None and stored_digest != digest:
+            raise ValueError('knowledge index is stale')
+        return cls(tables)
+
+
+def build_index():
+    import plant_data
+    return KnowledgeIndex(compile_tables(plant_data))
+
+
+def save_index(index, path=INDEX_PATH):
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(index.dumps(source_digest()))
+    os.replace(tmp, path)
+
+
+def load_index(path=INDEX_PATH):
+    # 有最新的快照就直接載入；快照不存在或 plant_data.py 已經修改過則重新編譯
+    digest = source_digest()
+    try:
+        with open(path, 'rb') as f:
+            return KnowledgeIndex.loads(f.read(), digest)
+    except (OSError, ValueError, EOFError, TypeError):
+        pass
+    index = build_index()
+    try:
+        save_index(index, path)
+    except OSError:
+        pass
+    return index
+
+
+_index = None
+
+
+def get_index():
+    global _index
+    if _index is None:
+        _index = load_index()
+    return _index
+
+
+if __name__ == '__main__':
+    # python knowledge_index.py [輸出路徑]：部署時預先產生快照
+    out = sys.argv[1] if len(sys.argv) > 1 else INDEX_PATH
+    index = build_index()
+    save_index(index, out)
+    print(f'{out}: {len(index.categories)} categories, {len(index.symptoms)} symptoms, '
+          f'{len(index.descriptions)} descriptions, {len(index.plants)} plants, {os.path.getsize(out)} bytes')
@@ -0,0 +1,221 @@
+# LINE Messaging API：簽章驗證、事件解析與回覆
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import requests
+
+import config
+import metrics
+
+log = logging.getLogger(__name__)
+
+LINE_API_URL = os.getenv('LINE_API_URL', 'https://api.line.me')
+
+
+def verify_signature(body, signature, secret=None):
+    # body 必須是原始的 request bytes，不能先 decode 再 encode
+    secret = config.LINE_CHANNEL_SECRET if secret is None else secret
+    if not secret or not signature:
+        return False
+    digest = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).digest()
+    return hmac.compare_digest(base64.b64encode(digest), signature.encode('utf-8'))
+
+
+def parse_events(body):
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return []
+    return payload.get('events', [])
+
+
+def first_delivery(event, seen):
+    # seen 為 idempotency 的 event set；沒有 webhookEventId 的 event 一律處理
+    event_id = event.get('webhookEventId')
+    return not event_id or seen.add(event_id)
+
+
+def text_event(event):
+    # 只處理使用者傳來的文字訊息，回傳 (userId, replyToken, 文字)
+    if event.get('type') != 'message':
+        return None
+    message = event.get('message', {})
+    if message.get('type') != 'text':
+        return None
+    return event.get('source', {}).get('userId'), event.get('replyToken'), message.get('text', '')
+
+
+MAX_MESSAGES = 5        # 每次 reply/push 最多 5 則訊息
+MAX_TEXT = 5000         # 每則文字訊息最多 5000 字
+MAX_RETRIES = int(os.getenv('LINE_MAX_RETRIES', '3'))
+POOL_SIZE = int(os.getenv('LINE_POOL_SIZE', '16'))
+# 等待動畫顯示的秒數 (5~60，5 的倍數)；送出下一則訊息時會自動消失
+LOADING_SECONDS = int(os.getenv('LINE_LOADING_SECONDS', '20'))
+
+
+class RawMessage(bytes):
+    # 已經序列化好的單則訊息 JSON (見 payloads.py)，送出時原樣寫入 request body
+    pass
+
+
+def _is_text(m):
+    return not isinstance(m, RawMessage) and m.get('type') == 'text'
+
+
+def encode_body(fields, messages):
+    head = json.dumps(fields, ensure_ascii=False, separators=(',', ':'))[:-1].encode('utf-8')
+    parts = [m if isinstance(m, RawMessage)
+             else json.dumps(m, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+             for m in messages]
+    return head + b',"messages":[' + b','.join(parts) + b']}'
+
+
+def pack_messages(messages):
+    # 把相鄰的文字訊息合併 (不超過 5000 字)，太長的文字切開，再每 5 則分成一批
+    packed = []
+    for m in messages:
+        if not _is_text(m):
+            packed.append(m)
+            continue
+        text = m['text']
+        if packed and _is_text(packed[-1]) and 'quickReply' not in packed[-1] \
+                and len(packed[-1]['text']) + 1 + len(text) <= MAX_TEXT:
+            # 後一則的 quickReply 等欄位要保留 (quick reply 只在最後一則訊息上才會顯示)
+            packed[-1] = {**packed[-1], **m, 'text': packed[-1]['text'] + '\n' + text}
+            continue
+        while len(text) > MAX_TEXT:
+            cut = text.rfind('\n', 0, MAX_TEXT)
+            if cut <= 0:
+                cut = MAX_TEXT
+            packed.append({'type': 'text', 'text': text[:cut]})
+            text = text[cut:].lstrip('\n')
+        packed.append({**m, 'text': text})
+    return [packed[i:i + MAX_MESSAGES] for i in range(0, len(packed), MAX_MESSAGES)]
+
+
+class LineSender:
+    # 共用一個 keep-alive 連線池；收到 429 時整個 sender 一起等到 Retry-After 之後
+    def __init__(self, base_url=LINE_API_URL, access_token=None, max_retries=MAX_RETRIES, pool_size=POOL_SIZE):
+        self.base_url = base_url
+        self.access_token = access_token
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._not_before = 0.0
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _post(self, path, fields, messages, headers=None):
+        return self._send(path, encode_body(fields, messages), headers)
+
+    def _send(self, path, body, headers=None):
+        headers = dict(headers or {})
+        headers['Authorization'] = 'Bearer ' + (self.access_token or config.CHANNEL_ACCESS_TOKEN)
+        headers['Content-Type'] = 'application/json; charset=utf-8'
+        for attempt in range(self.max_retries + 1):
+            wait = self._not_before - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self.calls += 1
+            r = self.session.post(self.base_url + path, data=body, headers=headers, timeout=5)
+            if r.status_code != 429 and r.status_code < 500:
+                return r
+            if attempt == self.max_retries:
+                return r
+            # 429：照 Retry-After 等；沒有的話用指數退避
+            try:
+                delay = float(r.headers.get('Retry-After', ''))
+            except ValueError:
+                delay = 0.5 * 2 ** attempt
+            if r.status_code == 429:
+                with self._lock:
+                    self._not_before = max(self._not_before, time.monotonic() + delay)
+            else:
+                time.sleep(delay)
+        return r
+
+    def reply(self, reply_token, messages, user_id=None):
+        # 超過 5 則時，第一批用 reply，其餘用 push 補送 (需要 user_id)
+        # reply 失敗 (例如 reply token 已過期) 時改用 push 送出全部訊息；回傳訊息是否送達
+        batches = pack_messages(messages)
+        if not batches:
+            return True
+        r = self._post('/v2/bot/message/reply', {'replyToken': reply_token}, batches[0])
+        if r.status_code == 200:
+            batches = batches[1:]
+        else:
+            log.warning('LINE reply failed: %s %s', r.status_code, r.text[:200])
+            metrics.line_failures.inc('reply', str(r.status_code))
+        if not batches:
+            return True
+        if not user_id:
+            return False
+        try:
+            self._push_batches(user_id, batches, None)
+        except requests.RequestException as e:
+            log.warning('LINE push after reply failed: %s', e)
+            metrics.line_failures.inc('push', str(getattr(e.response, 'status_code', 'error')))
+            return False
+        return True
+
+    def push(self, user_id, messages, retry_key=None):
+        self._push_batches(user_id, pack_messages(messages), retry_key)
+        return True
+
+    def start_loading(self, user_id, seconds=LOADING_SECONDS):
+        # 在聊天室顯示「輸入中」的等待動畫 (只有一對一聊天有效)；只是提示，失敗不影響回覆
+        seconds = min(60, max(5, seconds // 5 * 5))
+        body = json.dumps({'chatId': user_id, 'loadingSeconds': seconds}).encode('utf-8')
+        try:
+            r = self._send('/v2/bot/chat/loading/start', body)
+        except requests.RequestException:
+            return False
+        return r.status_code in (200, 202)
+
+    def _push_batches(self, user_id, batches, retry_key):
+        for i, batch in enumerate(batches):
+            headers = {}
+            if retry_key:
+                # 每一批需要不同的 retry key，但重試時要和上次相同
+                key = retry_key if i == 0 else str(uuid.uuid5(uuid.UUID(retry_key), str(i)))
+                headers['X-Line-Retry-Key'] = key
+            r = self._post('/v2/bot/message/push', {'to': user_id}, batch, headers)
+            # 409 代表同一個 retry key 已經送出過了
+            if r.status_code not in (200, 409):
+                r.raise_for_status()
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def get_sender():
+    global _sender
+    if _sender is None:
+        with _sender_lock:
+            if _sender is None:
+                _sender = LineSender()
+    return _sender
+
+
+def reply(reply_token, messages, user_id=None):
+    return get_sender().reply(reply_token, messages, user_id)
+
+
+def push(user_id, messages, retry_key=None):
+    # reply token 已經用掉或過期時，改用 push 主動傳訊息；
+    # retry_key 讓 LINE 在我們重試時不會重複送出同一則訊息
+    return get_sender().push(user_id, messages, retry_key)
+
+
+def start_loading(user_id, seconds=LOADING_SECONDS):
+    return get_sender().start_loading(user_id, seconds)
@@ -0,0 +1,154 @@
+# 執行時的效能指標，以 Prometheus 文字格式從 /metrics 輸出
+# 每個處理階段 (簽章、讀寫狀態、問卷、LINE 回覆、Gemini、圖片) 各自一個延遲直方圖，
+# 另外計算快取命中 / 未命中與各分類、症狀、植物的流量
+# 只用 perf_counter 與一把鎖，不需要額外套件；多個 worker 行程各自輸出自己的數字
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# 秒；涵蓋記憶體內查詢 (<1ms) 到 Gemini 生成 (數秒)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+TOKEN_BUCKETS = (32, 64, 128, 256, 512, 1024, 2048, 4096)
+
+_metrics = []
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    pairs.extend(f'{n}="{v}"' for n, v in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def get(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f'{self.name}{_labels(self.labels, labels)} {value}')
+        return lines
+
+
+class Gauge(Counter):
+    # 目前的值 (例如斷路器狀態)，不是累計
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self):
+        lines = super().render()
+        lines[1] = f'# TYPE {self.name} gauge'
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=STAGE_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._values = {}     # labels -> [每個 bucket 的次數..., +Inf 的次數, 總和]
+        self._lock = threading.Lock()
+        _metrics.append(self)
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(labels)
+            if counts is None:
+                counts = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[i] += 1
+            counts[-1] += value
+
+    @contextmanager
+    def time(self, *labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            items = sorted((labels, list(counts)) for labels, counts in self._values.items())
+        for labels, counts in items:
+            total = 0
+            for bound, n in zip(self.buckets + ('+Inf',), counts):
+                total += n
+                lines.append(f'{self.name}_bucket{_labels(self.labels, labels, [("le", bound)])} {total}')
+            lines.append(f'{self.name}_sum{_labels(self.labels, labels)} {counts[-1]}')
+            lines.append(f'{self.name}_count{_labels(self.labels, labels)} {total}')
+        return lines
+
+
+stage_seconds = Histogram(
+    'linebot_stage_seconds', 'Time spent in each stage of handling a message', ('stage',))
+events = Counter(
+    'linebot_events_total', 'Webhook events by outcome', ('result',))
+cache_requests = Counter(
+    'linebot_cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result'))
+category_requests = Counter(
+    'linebot_category_requests_total', 'Questionnaire category selections', ('category',))
+symptom_requests = Counter(
+    'linebot_symptom_requests_total', 'Symptom selections, from the questionnaire or free text', ('symptom',))
+plant_answers = Counter(
+    'linebot_plant_answers_total', 'Plants recommended, by how the answer was found', ('plant', 'source'))
+gemini_tokens = Counter(
+    'linebot_gemini_tokens_total', 'Gemini tokens by generation profile and kind', ('profile', 'kind'))
+gemini_output_tokens = Histogram(
+    'linebot_gemini_output_tokens', 'Output tokens per Gemini call', ('profile',), buckets=TOKEN_BUCKETS)
+gemini_trimmed = Counter(
+    'linebot_gemini_trimmed_inputs_total', 'User inputs shortened to fit the input token budget')
+rate_limited = Counter(
+    'linebot_rate_limited_total', 'Gemini requests held back by the rate limiter', ('reason', 'action'))
+coalesced = Counter(
+    'linebot_coalesced_total', 'Requests that shared an identical in-flight call', ('name',))
+circuit_state = Gauge(
+    'linebot_circuit_state', 'Circuit breaker state (0 closed, 1 half-open, 2 open)', ('name',))
+circuit_transitions = Counter(
+    'linebot_circuit_transitions_total', 'Circuit breaker transitions to open or half-open', ('name', 'state'))
+circuit_rejected = Counter(
+    'linebot_circuit_rejected_total', 'Calls failed fast by an open circuit breaker', ('name',))
+jobs = Counter(
+    'linebot_jobs_total', 'Background jobs by kind and outcome', ('kind', 'result'))
+line_failures = Counter(
+    'linebot_line_failures_total', 'LINE API calls that failed after retries', ('call', 'status'))
+
+
+def timer(stage):
+    # with metrics.timer('step'): ...
+    return stage_seconds.time(stage)
+
+
+def cache_result(cache, hit):
+    cache_requests.inc(cache, 'hit' if hit else 'miss')
+
+
+def render():
+    lines = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
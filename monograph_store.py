@@ -0,0 +1,87 @@
+# 植物說明文字 (monographs.txt) 的唯讀存取
+# 檔案以 mmap 開啟，只記錄每株植物與每個段落的位元組位置；
+# 文字要到真的需要回覆某株植物時才會被 decode
+import mmap
+import os
+
+MONOGRAPH_PATH = os.getenv('MONOGRAPH_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'monographs.txt'))
+
+PLANT_MARK = b'## '
+SECTIONS = ('營養成分', '健康功效', '烹調方式', '建議食用量', '⚠注意事項⚠')
+_SECTION_LINES = {s.encode('utf-8'): s for s in SECTIONS}
+
+
+class MonographStore:
+    def __init__(self, path=MONOGRAPH_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # plant -> (start, end)，只涵蓋內文，不含 "## 植物名" 那一行
+        self._plants = {}
+        # plant -> {段落名稱: (start, end)}，不含段落標題那一行
+        self._sections = {}
+        self._build_index()
+
+    def _build_index(self):
+        mm = self._mm
+        size = len(mm)
+        pos = 0
+        current = None
+        section = None
+        while pos < size:
+            end = mm.find(b'\n', pos)
+            if end < 0:
+                end = size
+            line = mm[pos:end].rstrip(b'\r')
+            if line.startswith(PLANT_MARK):
+                current = line[len(PLANT_MARK):].decode('utf-8').strip()
+                self._plants[current] = [end + 1, end + 1]
+                self._sections[current] = {}
+                section = None
+            elif current is not None and line:
+                self._plants[current][1] = end
+                if line in _SECTION_LINES:
+                    section = _SECTION_LINES[line]
+                    self._sections[current][section] = [end + 1, end + 1]
+                elif section is not None:
+                    self._sections[current][section][1] = end
+            pos = end + 1
+
+    def __contains__(self, plant):
+        return plant in self._plants
+
+    def plants(self):
+        return list(self._plants)
+
+    def _decode(self, start, end):
+        return self._mm[start:end].decode('utf-8').replace('\r', '')
+
+    def text(self, plant):
+        start, end = self._plants[plant]
+        return self._decode(start, end)
+
+    def lines(self, plant):
+        return self.text(plant).split('\n')
+
+    def sections(self, plant):
+        return list(self._sections[plant])
+
+    def section(self, plant, name):
+        # 回傳某個段落的內容 (不含段落標題)；沒有這個段落時回傳空字串
+        span = self._sections[plant].get(name)
+        if span is None:
+            return ''
+        return self._decode(*span)
+
+    def close(self):
+        self._mm.close()
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = MonographStore()
+    return _store
@@ -0,0 +1,129 @@
+# 問卷每個節點要回覆的訊息 (含 quick reply / Flex)，啟動時一次產生並序列化成 JSON bytes，
+# 回覆時直接把 bytes 接到 request body，不用每次組字串、做 JSON 編碼
+# version 是所有內容的雜湊 (類似 ETag)：內容改變時，舊版本的對話狀態就不再沿用
+import hashlib
+import json
+
+from knowledge_index import get_index
+from line_api import RawMessage
+from plant_data import Symptom_classification, valid_choices
+
+MENU_TEXT = """您好！我將為您推薦符合您症狀的藥用植物🌿
+
+請選擇以下最符合您症狀的種類(A~E):
+A: 呼吸系統與感冒問題
+B: 消化與代謝問題
+C: 皮膚與過敏問題
+D: 循環與泌尿系統問題
+E: 身心與內分泌問題
+X: 以上沒有符合我的症狀種類"""
+
+# 主選單按鈕上的文字；valid_choices 的 X 寫的是「退出」，但選 X 其實是改用自由描述
+MENU_LABELS = {'X': '以上都不符合'}
+
+FREE_TEXT_PROMPT = "請詳細描述您的症狀:"
+CATEGORY_ERROR = "輸入錯誤，請重新輸入 A, B, C, D, E 或 X"
+SYMPTOM_ERROR = "輸入錯誤，請重新輸入上述符合您的症狀:"
+
+MENU = 'menu'
+CATEGORY_ERROR_NODE = 'category_error'
+FREE_TEXT = 'free_text'
+SYMPTOMS = 'symptoms'               # ('symptoms', category_id)
+SYMPTOM_ERROR_NODE = 'symptom_error'
+DESCRIPTIONS = 'descriptions'       # ('descriptions', symptom_id)
+DESCRIPTION_ERROR = 'description_error'
+
+
+def quick_reply(options):
+    # options: [(按鈕文字, 送出的文字)]；LINE 最多 13 個，按鈕文字最多 20 字
+    return {'items': [
+        {'type': 'action', 'action': {'type': 'message', 'label': label[:20], 'text': text}}
+        for label, text in options[:13]]}
+
+
+def text_with_options(text, options):
+    return {'type': 'text', 'text': text, 'quickReply': quick_reply(options)}
+
+
+def descriptions_flex(symptom, options):
+    # 症狀描述通常很長，用 Flex 卡片列出，點選整列就會送出代號
+    rows = []
+    for letter, description in options:
+        rows.append({
+            'type': 'box', 'layout': 'horizontal', 'spacing': 'sm', 'paddingAll': 'sm',
+            'action': {'type': 'message', 'label': letter, 'text': letter},
+            'contents': [
+                {'type': 'text', 'text': letter, 'weight': 'bold', 'flex': 0, 'color': '#2E7D32'},
+                {'type': 'text', 'text': description, 'wrap': True, 'size': 'sm'},
+            ]})
+    return {
+        'type': 'flex',
+        'altText': "請選擇以下符合您的症狀描述:",
+        'contents': {
+            'type': 'bubble',
+            'header': {'type': 'box', 'layout': 'vertical', 'contents': [
+                {'type': 'text', 'text': symptom, 'weight': 'bold', 'size': 'lg'},
+                {'type': 'text', 'text': "請選擇以下符合您的症狀描述:", 'size': 'sm', 'color': '#888888'},
+            ]},
+            'body': {'type': 'box', 'layout': 'vertical', 'spacing': 'sm', 'contents': rows},
+        },
+        'quickReply': quick_reply([(letter, letter) for letter, _ in options]),
+    }
+
+
+def encode(message):
+    return RawMessage(json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def build_nodes(index):
+    menu_options = [(f"{letter}: {MENU_LABELS.get(letter, name)}", letter) for letter, name in valid_choices.items()]
+    nodes = {
+        MENU: text_with_options(MENU_TEXT, menu_options),
+        CATEGORY_ERROR_NODE: text_with_options(CATEGORY_ERROR, menu_options),
+        FREE_TEXT: {'type': 'text', 'text': FREE_TEXT_PROMPT},
+    }
+    for category, name in enumerate(index.categories):
+        shown = Symptom_classification[name]
+        options = [(s, s) for s in shown] + [('沒有', '沒有')]
+        symptoms = ", ".join(shown)
+        nodes[(SYMPTOMS, category)] = text_with_options(
+            f"以下有符合您的症狀描述嗎? {symptoms}\n請輸入符合您的症狀:", options)
+        nodes[(SYMPTOM_ERROR_NODE, category)] = text_with_options(SYMPTOM_ERROR, options)
+    for symptom, ids in enumerate(index.symptom_descriptions):
+        if not ids:
+            continue
+        options = [index.descriptions[d][1:] for d in ids]
+        letters = ', '.join(letter for letter, _ in options)
+        nodes[(DESCRIPTIONS, symptom)] = descriptions_flex(index.symptoms[symptom], options)
+        nodes[(DESCRIPTION_ERROR, symptom)] = text_with_options(
+            f"輸入錯誤，請重新輸入({letters})", [(letter, letter) for letter, _ in options])
+    return nodes
+
+
+class Payloads:
+    def __init__(self, index):
+        self.nodes = {key: encode(message) for key, message in build_nodes(index).items()}
+        digest = hashlib.sha1()
+        for key in sorted(self.nodes, key=repr):
+            digest.update(repr(key).encode('utf-8'))
+            digest.update(self.nodes[key])
+        self.version = digest.hexdigest()[:12]
+
+    def __getitem__(self, key):
+        return self.nodes[key]
+
+
+_payloads = None
+
+
+def get_payloads():
+    global _payloads
+    if _payloads is None:
+        _payloads = Payloads(get_index())
+    return _payloads
+
+
+if __name__ == '__main__':
+    payloads = get_payloads()
+    total = sum(len(b) for b in payloads.nodes.values())
+    print(f'version {payloads.version}: {len(payloads.nodes)} nodes, {total} bytes')
@@ -0,0 +1,134 @@
+# 植物說明卡：把 monographs.txt 的每株植物拆成段落，預先編碼成 LINE 訊息 JSON
+# 每株植物有：完整說明、各段落、以及精簡摘要，全部不超過 LINE 單則 5000 字的限制
+# 第一次用到某株植物時建立並快取，之後回覆只是一次字典查詢
+#   python plant_cards.py：一次建立全部並檢查長度
+import json
+import sys
+import threading
+from collections import namedtuple
+
+from line_api import MAX_TEXT
+from monograph_store import SECTIONS, get_store
+from payloads import encode
+
+SUMMARY_LIMIT = 1000
+SUMMARY_LINES = {'健康功效': 3, '⚠注意事項⚠': 2}
+
+# title、summary 為 RawMessage；full 為 RawMessage 的 tuple (超過 5000 字時切成多則)；
+# sections 為 {段落名稱: RawMessage}
+PlantCard = namedtuple('PlantCard', 'plant title full summary sections')
+
+
+def section_request(plant, section):
+    # 使用者點選 quick reply 時送出的文字
+    return f"{plant} {section}"
+
+
+def _text(text, quick_reply=None):
+    message = {'type': 'text', 'text': text}
+    if quick_reply:
+        message['quickReply'] = quick_reply
+    return encode(message)
+
+
+def _split(text, limit=MAX_TEXT):
+    chunks = []
+    while len(text) > limit:
+        cut = text.rfind('\n', 0, limit)
+        if cut <= 0:
+            cut = limit
+        chunks.append(text[:cut])
+        text = text[cut:].lstrip('\n')
+    chunks.append(text)
+    return chunks
+
+
+def parse_sections(store, plant):
+    # 回傳 [(段落名稱, [每一行])]，依檔案中的順序
+    sections = []
+    for name in store.sections(plant):
+        lines = [line for line in store.section(plant, name).split('\n') if line.strip()]
+        sections.append((name, lines))
+    return sections
+
+
+def build_card(store, plant):
+    sections = parse_sections(store, plant)
+    quick_reply = {'items': [
+        {'type': 'action', 'action': {'type': 'message', 'label': name[:20], 'text': section_request(plant, name)}}
+        for name, _ in sections]}
+
+    blocks = [f"【{name}】\n" + '\n'.join(lines) for name, lines in sections]
+    chunks = _split('\n\n'.join(blocks))
+    full = tuple(_text(chunk, quick_reply if i == len(chunks) - 1 else None) for i, chunk in enumerate(chunks))
+
+    summary_lines = [plant]
+    for name, lines in sections:
+        keep = SUMMARY_LINES.get(name)
+        if keep:
+            summary_lines.append(f"【{name}】")
+            summary_lines.extend(lines[:keep])
+    summary = '\n'.join(summary_lines)
+    if len(summary) > SUMMARY_LIMIT:
+        summary = summary[:SUMMARY_LIMIT - 1] + '…'
+
+    return PlantCard(
+        plant=plant,
+        title=_text(plant),
+        full=full,
+        summary=_text(summary, quick_reply),
+        sections={name: _text(_split(f"{plant}【{name}】\n" + '\n'.join(lines))[0], quick_reply)
+                  for name, lines in sections},
+    )
+
+
+class PlantCards:
+    def __init__(self, store):
+        self.store = store
+        self._cards = {}
+        self._lock = threading.Lock()
+        # "植物 段落" -> (植物, 段落)，只是名稱組合，不需要讀取內文
+        self.requests = {section_request(p, s): (p, s) for p in store.plants() for s in SECTIONS}
+
+    def get(self, plant):
+        card = self._cards.get(plant)
+        if card is None:
+            with self._lock:
+                card = self._cards.get(plant)
+                if card is None:
+                    card = self._cards[plant] = build_card(self.store, plant)
+        return card
+
+    def section_for(self, text):
+        # 使用者點了某個段落的 quick reply 時回傳該段落訊息，否則回傳 None
+        hit = self.requests.get(text)
+        if hit is None:
+            return None
+        return self.get(hit[0]).sections.get(hit[1])
+
+    def build_all(self):
+        for plant in self.store.plants():
+            self.get(plant)
+        return dict(self._cards)
+
+
+_cards = None
+
+
+def get_cards():
+    global _cards
+    if _cards is None:
+        _cards = PlantCards(get_store())
+    return _cards
+
+
+if __name__ == '__main__':
+    ok = True
+    for plant, card in get_cards().build_all().items():
+        full = sum(len(json.loads(m)['text']) for m in card.full)
+        summary = len(json.loads(card.summary)['text'])
+        missing = [s for s in SECTIONS if s not in card.sections]
+        print(f"{plant}: full {full} chars in {len(card.full)} message(s), summary {summary} chars"
+              + (f", missing {', '.join(missing)}" if missing else ''))
+        ok = ok and not missing
+    sys.exit(0 if ok else 1)
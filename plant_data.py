@@ -0,0 +1,274 @@
+# 症狀分類、症狀描述與藥用植物資料 (植物的詳細說明在 monographs.txt)
+
+Symptom_classification = {
+    '呼吸系統與感冒相關': ['感冒', '頭痛', '咳嗽', '痰多', '喉嚨痛', '喉嚨發炎', '氣喘', '肺熱', '無'],
+    '消化與代謝問題': ['消化不良', '腸胃不適', '胃痛', '腹瀉', '便秘', '高血糖', '口渴', '口乾舌燥', '食慾不振', '無'],
+    '皮膚與過敏相關': ['皮膚紅腫', '瘡癤感染', '皮膚炎', '皮膚搔癢', '過敏反應', '燙傷', '蚊蟲叮咬', '水腫', '無'],
+    '循環與泌尿系統': ['高血壓', '貧血', '血尿', '尿道感染', '腎臟問題', '心悸', '止血', '無'],
+    '身心與內分泌問題': ['免疫力低下', '月經不調', '失眠', '焦慮', '眼睛疲勞', '肝火旺盛', '疲勞', '痛風', '無']
+}
+Symptom_questions = {
+    '感冒': {
+        'A': '頭痛、鼻塞、畏寒、四肢乏力，對冷空氣敏感，體溫正常或僅微微升高.',
+        'B': '咽喉腫痛、聲音嘶啞、體溫超過 38°C、口乾舌燥、咽部灼熱，可能有輕微口腔潰瘍.',
+        'C': '頻繁咳嗽、咳痰不暢，痰液粘稠難以排出，夜間或清晨加重，可能伴隨氣喘或胸悶.',
+        'D': '近期多次感冒，症狀緩解後容易復發，對環境變化(季節交替、氣溫變化)敏感.',
+        'E': '皮膚紅腫、過敏、蕁麻疹，或感冒期間出現輕微皮疹及發癢症狀.'
+           },
+    '喉嚨痛': {
+        'A': '喉嚨乾燥、灼熱，異物感明顯，喝水無法緩解.',
+        'B': '咽喉紅腫疼痛，吞嚥困難，甚至影響進食與說話.',
+        'C': '伴隨咳嗽，痰少或無痰，咳嗽時喉嚨不適加重.'
+           },
+    '消化不良': {
+        'A': '飯後胃脹氣、噯氣，腹部悶脹不適，進食過快時加重.',
+        'B': '腸胃蠕動緩慢，排便困難，食物消化速度明顯變慢.',
+        'C': '腸胃蠕動緩慢，排便困難，食物胃痛，飯後不適加重，進食油膩或辛辣食物時更嚴重.',
+        'D': '胃寒，容易腹瀉，進食生冷食物後症狀加劇.',
+        'E': '進食後胃悶脹，飽腹感持續時間較長，消化時間延長.',
+        'F': '胃酸分泌過多，容易泛酸，胸口有灼熱感，易反胃.',
+        'G': '腹瀉頻繁，並伴隨食慾下降，進食後易腸鳴或不適.',
+        'H': '肝火旺盛，口乾舌燥，口腔易有異味，食慾降低.',
+        'I': '長時間便秘，排便困難，糞便乾燥，宿便堆積.',
+        'J': '進食生冷食物後，容易引發腸胃疼痛或消化不適.',
+        'K': '進食後頻繁打嗝，甚至影響說話與呼吸節奏.'
+           },
+    '口氣不清新': {
+        'A': '口腔乾燥，舌苔厚膩，嘴巴有異味，早晨起床時尤為明顯.',
+        'B': '飲食不當或消化不良後，口氣變重，伴隨胃部不適或脹氣感.'
+           },
+    '皮膚紅腫': {
+        'A': '皮膚因過敏或接觸刺激物後出現紅腫，可能伴隨搔癢、輕微脫皮或紅疹.',
+        'B': '皮膚紅腫且局部發炎，可能伴隨膿皰或傷口感染，按壓時有疼痛感.'
+           },
+    '燙傷': {
+        'A': '皮膚發紅，局部腫脹，輕微刺痛，但沒有水泡.',
+        'B': '燙傷處出現水泡，伴隨腫脹與疼痛，可能有滲液.',
+        'C': '燙傷後皮膚灼熱感強烈，紅腫範圍擴大，受熱部位明顯發炎.',
+        'D': '燙傷後傷口癒合緩慢，可能出現輕微潰爛或感染風險.'
+           },
+    '咳嗽': {
+        'A': '乾咳無痰，喉嚨發癢，夜間或清晨時咳嗽加重.',
+        'B': '咳嗽帶黃痰，痰多不易排出，胸悶，呼吸時有黏稠感.',
+        'C': '咳嗽伴隨氣喘或過敏反應，每當接觸冷空氣或粉塵時加重.',
+        'D': '受寒後咳嗽，鼻涕清稀，怕冷，通常伴隨輕微發熱.',
+        'E': '喉嚨有異物感，總覺得卡痰但咳不出來，導致頻繁清喉嚨.',
+        'F': '早晨起床時咳嗽嚴重，常有痰堵住喉嚨，需反覆咳出.',
+        'G': '夜間咳嗽頻繁，影響睡眠，特別是躺下時症狀加重.'
+           },
+    '發燒': {
+        'A': '低燒(37.5°C～38.5°C)，身體微熱但無明顯寒顫，伴隨口乾舌燥.',
+        'B': '高燒(超過 38.5°C)，全身發熱，伴隨頭痛、口渴、精神疲憊.',
+        'C': '反覆發燒，體溫波動較大，白天較低、夜間升高，可能合併其他炎症.',
+        'D': '發燒同時伴隨喉嚨紅腫、皮膚發熱感，甚至出現輕微紅疹.'
+           },
+    '皮膚炎': {
+        'A': '皮膚紅腫、發熱，可能有滲液或輕微潰爛，伴隨刺痛感.',
+        'B': '皮膚乾燥、脫屑，長期搔癢，抓破後可能出現紅腫或結痂.'
+           },
+    '腹瀉': {
+        'A': '腹部絞痛，排便次數增加，糞便呈水狀或半流質，可能伴隨噯氣或腸鳴.',
+        'B': '飲食後腸胃蠕動過快，出現腹瀉，且容易因生冷食物或油膩食物誘發.'
+           },
+    '高血壓': {
+        'A': '血壓升高時伴隨頭暈、頭痛、視力模糊，易感到疲勞.',
+        'B': '高血壓合併焦慮、失眠，夜間睡眠品質差，容易驚醒.',
+        'C': '血壓偏高，四肢容易水腫，手腳冰冷，疲勞感增加.',
+        'D': '血壓升高時伴隨口乾舌燥、煩躁易怒，甚至有口苦現象.',
+        'E': '長期高血壓影響腸胃，伴隨消化不良或排便異常.',
+        'F': '高血壓患者同時皮膚容易發紅、發炎或長期乾燥.',
+        'G': '伴隨便秘，排便困難，糞便乾硬，腸胃蠕動較慢.'
+           },
+    '水腫': {
+        'A': '下肢水腫，雙腳容易腫脹，站立過久或久坐後加重.',
+        'B': '水腫主要發生在眼瞼或臉部，早晨起床時較為明顯.',
+        'C': '腹部脹氣，感覺腸胃滯留水分，容易消化不良或便秘.',
+           },
+    '失眠': {
+        'A': '難以入睡，躺很久都無法進入睡眠，夜間思緒活躍.',
+        'B': '半夜容易驚醒，醒後難以再次入睡，睡眠品質差.',
+        'C': '白天精神不濟，容易疲倦嗜睡，但晚上精神異常興奮.'
+           },
+    '焦慮': {
+        'A': '長期緊張不安，容易因小事感到壓力，影響專注力與情緒穩定.',
+        'B': '焦慮伴隨心悸、胸悶，偶爾有呼吸急促的情況，甚至感到恐慌.',
+        'C': '焦慮影響睡眠，容易失眠、多夢，醒來後仍感疲勞'
+           },
+    '腸胃不適': {
+        'A': '胃部隱隱作痛，進食後加重，容易感到噁心或反胃.',
+        'B': '消化不良，進食後腹脹、腸胃悶滯，飽腹感持續較長時間.',
+        'C': '胃腸功能虛弱，容易腹瀉或腹部發涼，對冷食較敏感.',
+        'D': '腸胃蠕動異常，進食後易感到腸鳴，排便頻繁或不規律.'
+           },
+    '免疫力低下': {
+        'A': '容易感冒或感染，身體恢復速度慢，經常覺得疲倦乏力.',
+        'B': '季節變化時容易過敏，皮膚或呼吸道特別敏感，經常出現過敏反應.'
+           },
+    '氣喘': {
+        'A': '天氣變冷時氣喘加重，吸入冷空氣後容易發作，伴隨鼻塞或流鼻水.',
+        'B': '運動後容易喘，稍微劇烈活動就感到呼吸急促，恢復時間較長.',
+        'C': '咳嗽帶痰且伴隨氣喘，尤其是痰多時氣喘症狀會加劇.',
+        'D': '氣喘發作時胸悶，吸氣困難，深呼吸時感覺肺部不順暢.'
+           },
+    '肺熱': {
+        'A': '乾咳少痰或無痰，喉嚨乾燥，口渴，可能伴隨輕微發熱.',
+        'B': '咳痰呈黃稠狀，胸悶，可能伴隨喉嚨紅腫或咽痛.'
+           },
+    '口乾舌燥': {
+        'A': '口乾明顯，舌苔偏黃厚膩，可能伴隨口苦、煩躁易怒.',
+        'B': '口乾但口中無異味，舌苔較薄，常覺得口渴且想喝涼水.',
+        'C': '口乾舌燥，且容易便秘，皮膚偏乾燥，容易感到疲勞.'
+           },
+    '胃痛': {
+        'A': '胃部隱隱作痛，飯前或空腹時加重，進食後可稍微緩解.',
+        'B': '胃痛伴隨消化不良，進食後脹氣、胃悶，甚至噯氣或反酸.',
+        'C': '胃痛時感到腸胃蠕動異常，偶爾伴隨腹瀉或排便不規律'
+           },
+    '便秘': {
+        'A': '排便困難，糞便乾硬，排便次數減少，伴隨口乾舌燥.',
+        'B': '長期便祕，容易脹氣或腹部脹滿，排便不規律.',
+        'C': '排便時感到腸道蠕動不足，經常需要很用力才排得出來.'
+           },
+    '肝火旺盛': {
+        'A': '口乾舌燥，口苦，容易煩躁易怒，睡眠品質差.',
+        'B': '眼睛紅腫或乾澀，頭部容易發熱，時常感到疲勞.'
+           }
+}
+Symptom_answers = {
+    '感冒_A': '紫蘇',
+    '感冒_B': '薄荷',
+    '感冒_C': '咸豐草',
+    '感冒_D': '羅勒',
+    '感冒_E': '蚌蘭',
+    '喉嚨痛_A': '含羞草',
+    '喉嚨痛_B': '紫蘇',
+    '喉嚨痛_C': '薄荷',
+    '消化不良_A': '薄荷',
+    '消化不良_B': '紅鳳菜',
+    '消化不良_C': '羅勒',
+    '消化不良_D': '車前草',
+    '消化不良_E': '咸豐草',
+    '消化不良_F': '左手香',
+    '消化不良_G': '酢漿草',
+    '消化不良_H': '仙草',
+    '消化不良_I': '苦瓜',
+    '消化不良_J': '含羞草',
+    '口氣不清新_A': '薄荷',
+    '口氣不清新_B': '羅勒',
+    '皮膚紅腫_A': '落地生根',
+    '皮膚紅腫_B': '山芙蓉',
+    '燙傷_A': '蚌蘭',
+    '燙傷_B': '山芙蓉',
+    '燙傷_C': '落地生根',
+    '燙傷_D': '左手香',
+    '咳嗽_A': '台灣百合',
+    '咳嗽_B': '腎蕨',
+    '咳嗽_C': '車前草',
+    '咳嗽_D': '咸豐草',
+    '咳嗽_E': '羅勒',
+    '咳嗽_F': '山芙蓉',
+    '咳嗽_G': '美人蕉',
+    '發燒_A': '咸豐草',
+    '發燒_B': '仙草',
+    '發燒_C': '蚌蘭',
+    '發燒_D': '朱蕉',
+    '皮膚炎_A': '朱蕉',
+    '皮膚炎_B': '左手香',
+    '腹瀉_A': '美人蕉',
+    '腹瀉_B': '酢漿草',
+    '高血壓_A': '台灣百合',
+    '高血壓_B': '仙草',
+    '高血壓_C': '美人蕉',
+    '高血壓_D': '枸杞',
+    '高血壓_E': '山藥',
+    '高血壓_F': '紅鳳菜',
+    '高血壓_G': '苦瓜',
+    '水腫_A': '美人蕉',
+    '水腫_B': '車前草',
+    '水腫_C': '落地生根',
+    '失眠_A': '含羞草',
+    '失眠_B': '台灣百合',
+    '失眠_C': '枸杞',
+    '焦慮_A': '含羞草',
+    '焦慮_B': '紫蘇',
+    '焦慮_C': '羅勒',
+    '腸胃不適_A': '朱蕉',
+    '腸胃不適_B': '落地生根',
+    '腸胃不適_C': '山藥',
+    '腸胃不適_D': '含羞草',
+    '免疫力低下_A': '枸杞',
+    '免疫力低下_B': '山藥',
+    '氣喘_A': '紫蘇',
+    '氣喘_B': '左手香',
+    '氣喘_C': '咸豐草',
+    '氣喘_D': '腎蕨',
+    '肺熱_A': '台灣百合',
+    '肺熱_B': '腎蕨',
+    '口乾舌燥_A': '酢漿草',
+    '口乾舌燥_B': '仙草',
+    '口乾舌燥_C': '紅鳳菜',
+    '胃痛_A': '山藥',
+    '胃痛_B': '羅勒',
+    '胃痛_C': '酢漿草',
+    '便秘_A': '仙草',
+    '便秘_B': '紅鳳菜',
+    '便秘_C': '苦瓜',
+    '肝火旺盛_A': '酢漿草',
+    '肝火旺盛_B': '枸杞'
+}
+single_choice = {
+    '頭痛': '薄荷',
+    '瘡癤感染': '山芙蓉',
+    '喉嚨發炎': '山芙蓉',
+    '月經不調': '朱蕉',
+    '血尿': '朱蕉',
+    '痛風': '美人蕉',
+    '皮膚搔癢': '蚌蘭',
+    '過敏反應': '蚌蘭',
+    '眼睛疲勞': '枸杞',
+    '痰多': '腎蕨',
+    '心悸': '台灣百合',
+    '止血': '落地生根',
+    '貧血': '紅鳳菜',
+    '蚊蟲叮咬': '左手香',
+    '高血糖': '苦瓜',
+    '口渴': '苦瓜',
+    '疲勞': '山藥',
+    '尿道感染': '車前草',
+    '腎臟問題': '車前草',
+}
+image_url = {
+    '薄荷': 'https://upload.wikimedia.org/wikipedia/commons/thumb/b/b0/Mint-leaves-2007.jpg/800px-Mint-leaves-2007.jpg',
+    '山芙蓉': 'https://shoplineimg.com/5848f39d617069d6a59b0500/5d75b753b051d1001709bbf9/3860x.jpg?',
+    '朱蕉': 'https://www.picturethisai.com/wiki-image/1080/154495260783804421.jpeg',
+    '美人蕉': 'https://lh6.googleusercontent.com/proxy/3sKLm0TQ1fCGshFbjGfsndvUlEamdbYZ2gYT65gTj_TC9KFmhH5ugdLUN0L3bpFZB5Umk8HsE1DXSwtC9OTTgP6w500cdr8870_ZmqCU_Q',
+    '蚌蘭': 'https://www.picturethisai.com/wiki-image/1080/153723206052610076.jpeg',
+    '含羞草': 'https://shoplineimg.com/62cb90c69730d2004d2343f2/6704cdb009a23b000dc67808/750x.jpg?',
+    '枸杞': 'https://upload.wikimedia.org/wikipedia/commons/a/a7/Lycium_chinense%28siamak_sabet%29_%282%29.jpg',
+    '腎蕨': 'https://www.future.url.tw/images/plant/465/5eedd0aa0a4b3.JPG',
+    '台灣百合': 'https://lh4.googleusercontent.com/proxy/z7VXahNItLMq0PlosDgGnXB4TIQ0xbBpd7Hnpv5os7Ev1kkboSmC3AjzMnjQ_SPA8D6BNXzhzbdVhWtVxToJS59qfB3DRsogj94nCSW2Zf5KDeXLHrb7Cx2tzpkq6y_sY0bkciQJr-tAn-uLFffKiB_LYgFhyMQ9TRWV0cpdL8xNdThZ',
+    '落地生根': 'https://www.picturethisai.com/wiki-image/1080/154095334904037403.jpeg',
+    '酢漿草': 'https://upload.wikimedia.org/wikipedia/commons/3/35/Oxalis_corymbosa_2.jpg',
+    '咸豐草': 'https://www.newsmarket.com.tw/files/2021/12/%E5%92%B8%E8%B1%90%E8%8D%89%EF%BC%88%E5%9C%96%E7%89%87%E4%BE%86%E6%BA%90%EF%BC%8FShipher-Wu%EF%BC%8Cflickr%EF%BC%89.jpg',
+    '紅鳳菜': 'https://top1cdn.top1health.com/cdn/am/37758/99714.jpg',
+    '左手香': 'https://lupusa.net/wp-content/uploads/2023/05/IMG_5936-1024x683.jpeg',
+    '苦瓜': 'https://as.chdev.tw/web/article/7/e/4/7f7a4c5d-ed77-44ee-84e0-b8ee26d492721669609669.jpg',
+    '山藥': 'https://global-blog.cpcdn.com/tw/2021/10/AdobeStock_226788907-min--1-.jpeg',
+    '仙草': 'https://images.agriharvest.tw/wp-content/uploads/2023/03/1-24-1024x591.jpg',
+    '車前草': 'https://inaturalist-open-data.s3.amazonaws.com/photos/340473562/large.jpg',
+    '紫蘇': 'https://www.newsmarket.com.tw/files/2022/06/%E7%B4%AB%E8%98%87%EF%BC%88%E6%94%9D%E5%BD%B1%EF%BC%8F%E6%9E%97%E6%80%A1%E5%9D%87%EF%BC%89-1.jpg',
+    '羅勒': 'https://imgs.gvm.com.tw/upload/gallery/health/66364_01.jpg'
+}
+#有效的輸入(A/B/C/D/E/X)
+valid_choices = {
+    'A': '呼吸系統與感冒相關',
+    'B': '消化與代謝問題',
+    'C': '皮膚與過敏相關',
+    'D': '循環與泌尿系統',
+    'E': '身心與內分泌問題',
+    'X': '退出'}
+
+# 在這些症狀下直接顯示 single_choice 的植物
+direct_exit_symptoms = ['頭痛', '瘡癤感染', '喉嚨發炎', '月經不調', '血尿', '痛風',
+                        '皮膚搔癢', '過敏反應', '眼睛疲勞', '痰多', '心悸', '止血',
+                        '貧血', '蚊蟲叮咬', '高血糖', '口渴', '疲勞', '尿道感染', '腎臟問題']
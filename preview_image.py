@@ -0,0 +1,33 @@
+# 在本機或 notebook 用 matplotlib 預覽植物圖片
+# 伺服器不會 import 這個檔案，回覆只傳圖片網址
+#   python preview_image.py 薄荷 紫蘇
+import sys
+
+import matplotlib.pyplot as plt
+import requests
+from PIL import Image
+
+from circuit_breaker import CircuitOpen
+from image_cache import get_cache
+from plant_data import image_url
+
+
+def image(url):
+  cache = get_cache()
+  try:
+    filename = cache.fetch(url) # 先查本機快取，沒有才下載
+  except (requests.RequestException, CircuitOpen):
+    print('Failed to download image')
+    return
+
+  img = Image.open(cache.path(filename)) # 讀取圖片內容
+
+  plt.imshow(img) # 使用 matplotlib 顯示圖片
+  plt.axis('off')  # 不顯示坐標軸
+  plt.show()
+
+
+if __name__ == '__main__':
+    for plant in sys.argv[1:] or image_url:
+        print(plant)
+        image(image_url[plant])
@@ -0,0 +1,168 @@
+# Gemini 呼叫的限流：每位使用者與全體各一個 token bucket，加上每日額度帳本
+# bucket 以 GCRA 實作，每個 key 只存一個「理論抵達時間」(TAT)，檢查只是一次字典讀寫，不需要鎖；
+# 同一個 key 剛好被兩個執行緒同時更新時可能多放行一次，對限流來說可以接受
+# 超過限制時依 RATE_LIMIT_POLICY 處理：
+#   queue   排隊，等 bucket 有空位再問 Gemini (等太久或今天額度用完時改用 degrade)
+#   degrade 不問 Gemini，改用放寬門檻的本機比對
+#   refuse  直接請使用者稍後再試
+import os
+import threading
+import time
+
+import metrics
+from backends import make_backend, thread_connection
+
+USER_PER_MIN = float(os.getenv('RATE_LIMIT_USER_PER_MIN', '3'))
+USER_BURST = int(os.getenv('RATE_LIMIT_USER_BURST', '3'))
+GLOBAL_PER_MIN = float(os.getenv('RATE_LIMIT_GLOBAL_PER_MIN', '60'))
+GLOBAL_BURST = int(os.getenv('RATE_LIMIT_GLOBAL_BURST', '10'))
+DAILY_CALLS = int(os.getenv('GEMINI_DAILY_CALLS', '0'))      # 0 代表不限制
+DAILY_TOKENS = int(os.getenv('GEMINI_DAILY_TOKENS', '0'))
+POLICY = os.getenv('RATE_LIMIT_POLICY', 'queue')
+MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '60'))      # 秒，queue 最多讓使用者等多久
+SWEEP_EVERY = 1024
+
+ALLOW = 'allow'
+QUEUE = 'queue'
+DEGRADE = 'degrade'
+REFUSE = 'refuse'
+
+GLOBAL_KEY = ''
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst):
+        self.interval = 60 / per_minute
+        self.burst = burst
+        self._tat = {}      # key -> 理論抵達時間 (monotonic)
+        self._commits = 0
+
+    def wait(self, key, now):
+        # 回傳 (還要等幾秒才能放行，放行後的 TAT)；等待秒數 <= 0 代表現在就可以
+        tat = max(self._tat.get(key, now), now) + self.interval
+        return tat - now - self.burst * self.interval, tat
+
+    def commit(self, key, tat):
+        self._tat[key] = tat
+        self._commits += 1
+        if self._commits % SWEEP_EVERY == 0:
+            self._sweep()
+
+    def _sweep(self):
+        # TAT 已經過去的 key 等同於滿的 bucket，可以刪掉
+        now = time.monotonic()
+        for key, tat in list(self._tat.items()):
+            if tat <= now:
+                self._tat.pop(key, None)
+
+    def __len__(self):
+        return len(self._tat)
+
+
+def today():
+    return time.strftime('%Y-%m-%d')
+
+
+class MemoryLedger:
+    # 每日的 Gemini 呼叫次數與 token 用量 (只計算這個行程)
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day = today()
+        self._calls = 0
+        self._tokens = 0
+
+    def record(self, calls=0, tokens=0):
+        day = today()
+        with self._lock:
+            if day != self._day:
+                self._day, self._calls, self._tokens = day, 0, 0
+            self._calls += calls
+            self._tokens += tokens
+
+    def usage(self):
+        if self._day != today():
+            return 0, 0
+        return self._calls, self._tokens
+
+
+class SQLiteLedger:
+    # 多個 worker 行程共用同一份額度；每天一列，保留歷史方便對帳
+    def __init__(self, path):
+        self.path = path
+        self._conn = thread_connection(path)
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS quota (day TEXT PRIMARY KEY, calls INTEGER NOT NULL, tokens INTEGER NOT NULL)')
+
+    def record(self, calls=0, tokens=0):
+        self._conn().execute(
+            'INSERT INTO quota (day, calls, tokens) VALUES (?, ?, ?) '
+            'ON CONFLICT (day) DO UPDATE SET calls = calls + excluded.calls, tokens = tokens + excluded.tokens',
+            (today(), calls, tokens))
+
+    def usage(self):
+        row = self._conn().execute('SELECT calls, tokens FROM quota WHERE day = ?', (today(),)).fetchone()
+        return row or (0, 0)
+
+
+def make_ledger():
+    # QUOTA_BACKEND=memory (預設) 或 sqlite；sqlite 檔案位置由 QUOTA_DB 指定
+    return make_backend('QUOTA', MemoryLedger, SQLiteLedger, 'quota.db')
+
+
+class RateLimiter:
+    def __init__(self, ledger, policy=POLICY, max_wait=MAX_WAIT):
+        if policy not in (QUEUE, DEGRADE, REFUSE):
+            raise ValueError(f'unknown RATE_LIMIT_POLICY: {policy}')
+        self.ledger = ledger
+        self.policy = policy
+        self.max_wait = max_wait
+        self.users = TokenBucket(USER_PER_MIN, USER_BURST)
+        self.all = TokenBucket(GLOBAL_PER_MIN, GLOBAL_BURST)
+
+    def quota_left(self):
+        calls, tokens = self.ledger.usage()
+        return not (DAILY_CALLS and calls >= DAILY_CALLS or DAILY_TOKENS and tokens >= DAILY_TOKENS)
+
+    def admit(self, user_id):
+        # 問 Gemini 之前呼叫，回傳 (動作, 等待秒數)：
+        # ALLOW 現在就問；QUEUE 等待秒數之後再問 (名額已經保留)；DEGRADE / REFUSE 不要問
+        if not self.quota_left():
+            return self._overflow('quota')
+        now = time.monotonic()
+        user_wait, user_tat = self.users.wait(user_id, now)
+        global_wait, global_tat = self.all.wait(GLOBAL_KEY, now)
+        wait = max(user_wait, global_wait)
+        if wait > 0 and not (self.policy == QUEUE and wait <= self.max_wait):
+            return self._overflow('user' if user_wait >= global_wait else 'global')
+        self.users.commit(user_id, user_tat)
+        self.all.commit(GLOBAL_KEY, global_tat)
+        if wait > 0:
+            metrics.rate_limited.inc('user' if user_wait >= global_wait else 'global', QUEUE)
+            return QUEUE, wait
+        return ALLOW, 0
+
+    def _overflow(self, reason):
+        action = REFUSE if self.policy == REFUSE else DEGRADE
+        metrics.rate_limited.inc(reason, action)
+        return action, 0
+
+
+_ledger = None
+_limiter = None
+_init_lock = threading.Lock()
+
+
+def get_ledger():
+    global _ledger
+    if _ledger is None:
+        with _init_lock:
+            if _ledger is None:
+                _ledger = make_ledger()
+    return _ledger
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(get_ledger())
+    return _limiter
@@ -0,0 +1,119 @@
+# 問卷進度的保存：以 LINE userId 為 key，閒置超過 TTL 的對話會被清掉
+# 兩種實作都有 get / set / delete，以及清除過期對話並回傳清除數量的 sweep
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from backends import make_backend, thread_connection
+
+SESSION_TTL = int(os.getenv('SESSION_TTL', '1800'))          # 秒
+SESSION_MAX = int(os.getenv('SESSION_MAX', '100000'))        # 最多保留的對話數
+SWEEP_EVERY = 256                                            # 每寫入幾次順便清一次過期資料
+
+
+class MemorySessionStore:
+    # 行程內 LRU + TTL：OrderedDict 依最後使用時間排序，
+    # 最舊的在最前面，所以清除過期資料只需要從頭掃到第一筆未過期的
+    def __init__(self, ttl=SESSION_TTL, max_sessions=SESSION_MAX):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._data = OrderedDict()   # user_id -> (expires, state)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, user_id):
+        with self._lock:
+            item = self._data.get(user_id)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._data[user_id]
+                return None
+            return item[1]
+
+    def set(self, user_id, state):
+        with self._lock:
+            self._data[user_id] = (time.monotonic() + self.ttl, state)
+            self._data.move_to_end(user_id)
+            while len(self._data) > self.max_sessions:
+                self._data.popitem(last=False)
+            self._writes += 1
+            if self._writes % SWEEP_EVERY == 0:
+                self._sweep_locked()
+
+    def delete(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def sweep(self):
+        with self._lock:
+            return self._sweep_locked()
+
+    def _sweep_locked(self):
+        now = time.monotonic()
+        removed = 0
+        while self._data:
+            user_id, (expires, _) = next(iter(self._data.items()))
+            if expires > now:
+                break
+            del self._data[user_id]
+            removed += 1
+        return removed
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteSessionStore:
+    # 存在 SQLite 檔案裡，重新啟動後仍可接續問卷；每個執行緒各自一個連線
+    def __init__(self, path, ttl=SESSION_TTL, max_sessions=SESSION_MAX):
+        self.path = path
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        # 以 with conn: 包住的寫入各自是一個交易
+        self._conn = thread_connection(path, isolation_level='')
+        self._writes = 0
+        with self._conn() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions ('
+                'user_id TEXT PRIMARY KEY, state TEXT NOT NULL, expires REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)')
+
+    def get(self, user_id):
+        row = self._conn().execute(
+            'SELECT state FROM sessions WHERE user_id = ? AND expires > ?',
+            (user_id, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, user_id, state):
+        with self._conn() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (user_id, state, expires) VALUES (?, ?, ?)',
+                (user_id, json.dumps(state, ensure_ascii=False), time.time() + self.ttl))
+        self._writes += 1
+        if self._writes % SWEEP_EVERY == 0:
+            self.sweep()
+
+    def delete(self, user_id):
+        with self._conn() as conn:
+            conn.execute('DELETE FROM sessions WHERE user_id = ?', (user_id,))
+
+    def sweep(self):
+        with self._conn() as conn:
+            removed = conn.execute('DELETE FROM sessions WHERE expires <= ?', (time.time(),)).rowcount
+            # 超過上限時，先刪掉最快過期 (也就是最久沒動) 的對話
+            removed += conn.execute(
+                'DELETE FROM sessions WHERE user_id IN ('
+                'SELECT user_id FROM sessions ORDER BY expires DESC LIMIT -1 OFFSET ?)',
+                (self.max_sessions,)).rowcount
+        return removed
+
+    def __len__(self):
+        return self._conn().execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+
+def make_session_store():
+    # SESSION_BACKEND=memory (預設) 或 sqlite；sqlite 檔案位置由 SESSION_DB 指定
+    return make_backend('SESSION', MemorySessionStore, SQLiteSessionStore, 'sessions.db')
@@ -0,0 +1,175 @@
+# Single-flight：同一個 key 同時只有一個進行中的對外呼叫，其他相同的請求共用它的結果
+# 尖峰時很多人同時要同一張圖片、或同時問同一個常見問題，只會發出一次下載 / Gemini 請求
+# 串流的結果由獨立的執行緒 (或 task) 讀完並放進共用的緩衝，每個請求各自從頭讀，
+# 某個請求中途放棄也不會影響其他人
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import metrics
+
+
+class _Broadcast:
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self.cond = threading.Condition()
+
+    def run(self, iterator):
+        try:
+            for item in iterator:
+                with self.cond:
+                    self.items.append(item)
+                    self.cond.notify_all()
+        except BaseException as e:
+            self.error = e
+        finally:
+            with self.cond:
+                self.done = True
+                self.cond.notify_all()
+
+    def __iter__(self):
+        i = 0
+        while True:
+            with self.cond:
+                while i >= len(self.items) and not self.done:
+                    self.cond.wait()
+                if i >= len(self.items):
+                    if self.error is not None:
+                        raise self.error
+                    return
+                item = self.items[i]
+            i += 1
+            yield item
+
+
+class SingleFlight:
+    # 執行緒版本
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}    # key -> Future 或 _Broadcast
+
+    def _join(self, key, factory):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                metrics.coalesced.inc(self.name)
+                return call, False
+            call = self._calls[key] = factory()
+            return call, True
+
+    def _leave(self, key, call):
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+    def do(self, key, fn, *args):
+        future, leader = self._join(key, Future)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self._leave(key, future)
+            future.set_exception(e)
+            raise
+        self._leave(key, future)
+        future.set_result(result)
+        return result
+
+    def stream(self, key, fn, *args):
+        # fn(*args) 回傳 iterator；回傳一個可以從頭讀到尾的 iterator
+        broadcast, leader = self._join(key, _Broadcast)
+        if leader:
+            def drive():
+                try:
+                    broadcast.run(fn(*args))
+                finally:
+                    self._leave(key, broadcast)
+            threading.Thread(target=drive, name=f'{self.name}-flight', daemon=True).start()
+        return iter(broadcast)
+
+    def __len__(self):
+        return len(self._calls)
+
+
+class _AsyncBroadcast:
+    def __init__(self):
+        self.items = []
+        self.done = False
+        self.error = None
+        self.changed = asyncio.Event()
+        self.task = None
+
+    def _notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def run(self, aiterator):
+        try:
+            async for item in aiterator:
+                self.items.append(item)
+                self._notify()
+        except BaseException as e:
+            self.error = e
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self.done = True
+            self._notify()
+
+    async def read(self):
+        i = 0
+        while True:
+            if i < len(self.items):
+                yield self.items[i]
+                i += 1
+            elif self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+            else:
+                await self.changed.wait()
+
+
+class AsyncSingleFlight:
+    # asyncio 版本：每個 event loop 各自一份進行中的呼叫
+    def __init__(self, name):
+        self.name = name
+        self._loops = {}
+
+    def _calls(self):
+        loop = asyncio.get_running_loop()
+        calls = self._loops.get(loop)
+        if calls is None:
+            calls = self._loops[loop] = {}
+        return calls
+
+    def _forget(self, calls, key, call):
+        if calls.get(key) is call:
+            del calls[key]
+
+    async def do(self, key, fn, *args):
+        calls = self._calls()
+        task = calls.get(key)
+        if task is None:
+            task = calls[key] = asyncio.ensure_future(fn(*args))
+            task.add_done_callback(lambda t: self._forget(calls, key, t))
+        else:
+            metrics.coalesced.inc(self.name)
+        # shield：其中一個請求被取消時，不會取消其他人也在等的呼叫
+        return await asyncio.shield(task)
+
+    def stream(self, key, fn, *args):
+        # fn(*args) 回傳 async iterator；回傳一個可以從頭讀到尾的 async iterator
+        calls = self._calls()
+        broadcast = calls.get(key)
+        if broadcast is None:
+            broadcast = calls[key] = _AsyncBroadcast()
+            broadcast.task = asyncio.ensure_future(broadcast.run(fn(*args)))
+            broadcast.task.add_done_callback(lambda t: self._forget(calls, key, broadcast))
+        else:
+            metrics.coalesced.inc(self.name)
+        return broadcast.read()
@@ -0,0 +1,63 @@
+# 需要幾秒以上的回覆改由背景工作處理：
+# webhook 先用 reply token 回「思考中」，結果再用 push 傳給使用者
+# 串流模式 (GEMINI_STREAM，預設開啟) 下邊生成邊以句子為單位 push，見 streaming.py
+# Gemini 斷路中時不排工作，直接用本機比對的結果回覆
+import uuid
+
+from circuit_breaker import CircuitOpen
+import line_api
+from conversation import QUEUED_TEXT, UNAVAILABLE_TEXT, busy_messages, text_message
+import gemini_client
+from gemini_client import answer, ERROR_TEXT
+from job_queue import get_queue, register
+import rate_limit
+from streaming import push_stream
+
+THINKING_TEXT = "收到您的描述，正在為您查詢，請稍候…"
+
+
+def ai_answer_job(payload):
+    try:
+        if gemini_client.STREAM:
+            push_stream(payload['user_id'], payload['text'], payload['retry_key'])
+            return
+        text = answer(payload['text'])
+    except CircuitOpen:
+        # 排隊期間 Gemini 斷路了：不重試，改送本機比對的結果
+        messages = busy_messages(payload['text'], notice=UNAVAILABLE_TEXT)
+        line_api.push(payload['user_id'], messages, retry_key=payload['retry_key'])
+        return
+    line_api.push(payload['user_id'], [text_message(text)], retry_key=payload['retry_key'])
+
+
+def ai_answer_failed(payload):
+    messages = busy_messages(payload['text'], notice=ERROR_TEXT)
+    line_api.push(payload['user_id'], messages, retry_key=payload['retry_key'])
+
+
+register('ai_answer', ai_answer_job, on_failure=ai_answer_failed)
+
+
+def deferred_ai(user_id, event_id):
+    # 給 conversation.step() 的 ask_ai：快取有答案時直接回覆，否則把問題排入佇列，立刻回傳「思考中」
+    # 超過限流時依 rate_limit 的結果延後執行、改用本機比對或請使用者稍後再試
+    def ask_ai(text):
+        # 快取裡已經有答案時直接放進 reply，不排工作也不經過限流 (不用多花一則 push)
+        cached = gemini_client.cached_answer(text)
+        if cached is not None:
+            return cached
+        if not gemini_client.available():
+            return busy_messages(text, notice=UNAVAILABLE_TEXT)
+        action, wait = rate_limit.get_limiter().admit(user_id)
+        if action in (rate_limit.DEGRADE, rate_limit.REFUSE):
+            return busy_messages(text, degrade=action == rate_limit.DEGRADE)
+        get_queue().enqueue('ai_answer', {
+            'user_id': user_id,
+            'text': text,
+            # 同一個工作重試時使用同一個 key，LINE 才能去除重複的 push
+            'retry_key': str(uuid.uuid4()),
+        }, dedup_key=f'ai_answer:{event_id}' if event_id else None, delay=wait)
+        if action == rate_limit.QUEUE:
+            return QUEUED_TEXT.format(seconds=max(1, round(wait)))
+        return THINKING_TEXT
+    return ask_ai
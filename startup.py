@@ -0,0 +1,79 @@
+# 冷啟動：google.generativeai、PIL、matplotlib 都很重，伺服器 import 時一律不載入，
+# 第一次用到時才由 gemini_client / image_variants 自己 import
+# 常駐的伺服器可以設 PRELOAD_HEAVY=1，在開始接收請求後於背景執行緒先載入，
+# 第一個要問 Gemini 的使用者就不用等；serverless / 自動擴展的 instance 保持預設 (不預載)
+#   python startup.py [app|asgi]：在全新的行程裡量測 import 時間，超過預算或載入了重的模組就失敗
+import os
+import subprocess
+import sys
+import threading
+import time
+
+# 各入口的 import 時間預算 (毫秒)；fastapi 本身就要 300ms 左右，asgi 的預算比較寬
+# 設定 IMPORT_BUDGET_MS 時所有入口都用同一個預算
+IMPORT_BUDGETS = {'app': 600, 'asgi': 900}
+IMPORT_BUDGET_MS = os.getenv('IMPORT_BUDGET_MS')
+PRELOAD_HEAVY = os.getenv('PRELOAD_HEAVY', '') not in ('', '0')
+
+# 請求處理路徑上不應該在 import 時出現的模組
+HEAVY_MODULES = ('google.generativeai', 'PIL.Image', 'matplotlib', 'google.colab')
+# 預載時依序 import 的模組 (伺服器只會用到這兩個)
+PRELOAD_MODULES = ('google.generativeai', 'PIL.Image')
+
+
+def _preload():
+    import importlib
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def preload():
+    # PRELOAD_HEAVY=1 時在背景載入重的模組，不影響啟動時間
+    if not PRELOAD_HEAVY:
+        return None
+    t = threading.Thread(target=_preload, name='preload', daemon=True)
+    t.start()
+    return t
+
+
+def budget(module):
+    if IMPORT_BUDGET_MS:
+        return float(IMPORT_BUDGET_MS)
+    return IMPORT_BUDGETS.get(module, IMPORT_BUDGETS['app'])
+
+
+def measure(module):
+    # 在全新的 Python 行程裡 import module，回傳 (毫秒, 載入的重模組)
+    code = (
+        'import sys, time\n'
+        f'sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n'
+        'start = time.perf_counter()\n'
+        f'import {module}\n'
+        'elapsed = (time.perf_counter() - start) * 1000\n'
+        f'heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]\n'
+        'print(elapsed, *heavy)\n'
+    )
+    # 不啟動背景工作的執行緒，以免執行佇列裡剩下的工作而載入重的模組
+    env = dict(os.environ, PRELOAD_HEAVY='0', JOB_WORKERS='0')
+    out = subprocess.run([sys.executable, '-c', code], env=env, check=True,
+                         capture_output=True, text=True).stdout.split()
+    return float(out[0]), out[1:]
+
+
+if __name__ == '__main__':
+    module = sys.argv[1] if len(sys.argv) > 1 else 'app'
+    # 取最快的一次，避免受到磁碟快取影響
+    results = [measure(module) for _ in range(3)]
+    elapsed = min(ms for ms, _ in results)
+    heavy = results[0][1]
+    limit = budget(module)
+    print(f'import {module}: {elapsed:.0f} ms (budget {limit:.0f} ms)')
+    if heavy:
+        print('heavy modules loaded at import time: ' + ', '.join(heavy))
+    start = time.perf_counter()
+    _preload()
+    print(f'lazy modules take {(time.perf_counter() - start) * 1000:.0f} ms on first use')
+    sys.exit(0 if elapsed <= limit and not heavy else 1)
@@ -0,0 +1,143 @@
+# Gemini 串流回答的分段傳送：文字累積到句子結尾才送出一段
+# 第一段越短越好 (盡快讓使用者看到內容)，之後的段落累積較多文字再送，
+# 並限制段落數，避免一個回答用掉太多則 push (會計入每月的訊息額度)
+# 等待下一段時顯示 LINE 的等待動畫，送出訊息後動畫會自動消失
+import asyncio
+import os
+import traceback
+import uuid
+
+from circuit_breaker import CircuitOpen
+import line_api
+from conversation import UNAVAILABLE_TEXT, busy_messages, text_message
+from gemini_client import ERROR_TEXT, stream, stream_async
+
+SENTENCE_ENDS = '。！？!?\n'
+FIRST_CHARS = int(os.getenv('STREAM_FIRST_CHARS', '12'))    # 第一段至少幾個字
+MIN_CHARS = int(os.getenv('STREAM_MIN_CHARS', '200'))       # 之後每段至少幾個字
+MAX_PARTS = int(os.getenv('STREAM_MAX_PARTS', '3'))         # 一個回答最多分成幾則訊息
+
+
+class SentenceBuffer:
+    def __init__(self, first_chars=FIRST_CHARS, min_chars=MIN_CHARS, max_parts=MAX_PARTS):
+        self.first_chars = first_chars
+        self.min_chars = min_chars
+        self.max_parts = max_parts
+        self.text = ''
+        self.parts = 0
+
+    def feed(self, piece):
+        # 加入一段生成的文字，回傳現在可以送出的段落 (最多一段)
+        self.text += piece
+        # 最後一段留給 flush()，把剩下的文字一次送完
+        if self.parts >= self.max_parts - 1:
+            return []
+        threshold = self.first_chars if self.parts == 0 else self.min_chars
+        cut = max(self.text.rfind(c) for c in SENTENCE_ENDS) + 1
+        if cut < threshold:
+            return []
+        part = self.text[:cut].strip()
+        self.text = self.text[cut:].lstrip()
+        if not part:
+            return []
+        self.parts += 1
+        return [part]
+
+    def flush(self):
+        part = self.text.strip()
+        self.text = ''
+        if part:
+            self.parts += 1
+        return part
+
+
+def part_key(retry_key, n):
+    # 每一段各自的 X-Line-Retry-Key，工作重試時已送出的段落會被 LINE 擋下 (409)
+    return str(uuid.uuid5(uuid.UUID(retry_key), f'part{n}'))
+
+
+def push_stream(user_id, text, retry_key):
+    # 背景工作用：邊生成邊 push；還沒送出任何段落就出錯時丟出例外讓工作重試，
+    # 已經送出部分內容後出錯就補一則錯誤訊息，不再重新生成
+    buffer = SentenceBuffer()
+    sent = 0
+    line_api.start_loading(user_id)
+    loading = True
+
+    def send(part):
+        nonlocal sent, loading
+        line_api.push(user_id, [text_message(part)], retry_key=part_key(retry_key, sent))
+        sent += 1
+        loading = False
+
+    try:
+        for piece in stream(text):
+            # 送出訊息後動畫就消失了，還有文字進來才再顯示
+            if not loading:
+                line_api.start_loading(user_id)
+                loading = True
+            for part in buffer.feed(piece):
+                send(part)
+        rest = buffer.flush()
+        if rest:
+            send(rest)
+    except Exception:
+        if not sent:
+            raise
+        traceback.print_exc()
+        send(ERROR_TEXT)
+    return sent
+
+
+def streaming_ai_async(user_id, after_reply):
+    # 給 conversation.step_async() 的 ask_ai：等到第一段就回傳，用 reply token 送出 (最快、不計額度)；
+    # 剩下的段落包成 coroutine 放進 after_reply，由呼叫端在 reply 之後執行
+    async def ask_ai(text):
+        asyncio.get_running_loop().run_in_executor(None, line_api.start_loading, user_id)
+        pieces = stream_async(text)
+        buffer = SentenceBuffer()
+        try:
+            async for piece in pieces:
+                ready = buffer.feed(piece)
+                if ready:
+                    break
+            else:
+                return buffer.flush()
+        except CircuitOpen:
+            return await asyncio.to_thread(busy_messages, text, notice=UNAVAILABLE_TEXT)
+        except Exception:
+            traceback.print_exc()
+            return ERROR_TEXT
+        after_reply.append(push_rest_async(user_id, pieces, buffer))
+        return ready[0]
+    return ask_ai
+
+
+async def push_rest_async(user_id, pieces, buffer):
+    retry_key = str(uuid.uuid4())
+    sent = 0
+    loading = False
+
+    async def send(part):
+        nonlocal sent, loading
+        await asyncio.to_thread(line_api.push, user_id, [text_message(part)], part_key(retry_key, sent))
+        sent += 1
+        loading = False
+
+    try:
+        async for piece in pieces:
+            if not loading:
+                await asyncio.to_thread(line_api.start_loading, user_id)
+                loading = True
+            for part in buffer.feed(piece):
+                await send(part)
+        rest = buffer.flush()
+        if rest:
+            await send(rest)
+    except Exception:
+        traceback.print_exc()
+        try:
+            await send(ERROR_TEXT)
+        except Exception:
+            traceback.print_exc()
+    return sent
@@ -0,0 +1,164 @@
+# 本機的症狀文字比對：把使用者自由輸入的描述對應到症狀 / 症狀描述 / 植物
+# 以中文字 bigram 建立倒排索引，用 TF-IDF 的 cosine 相似度評分；
+# 只有比對不到 (分數低於門檻) 的訊息才需要交給 Gemini
+# 除了症狀描述之外，每個症狀名稱與分類關鍵字也各是一份文件：只輸入「咳嗽」時對應到該症狀的問卷，
+# 由使用者選擇描述，而不是猜一種植物；「問題」、「最近」這類到處都有的詞不計分，
+# 前面有否定詞的症狀 (「沒有失眠」、「不是高血壓」) 在比對前先刪掉
+import math
+import os
+import re
+from collections import Counter, namedtuple
+
+from gemini_cache import normalize
+from knowledge_index import get_index, NO_PLANT
+
+MATCH_THRESHOLD = float(os.getenv('MATCH_THRESHOLD', '0.35'))
+
+# description 為 NO_PLANT 時代表直接以症狀對應植物 (single_choice)；
+# plant 也是 NO_PLANT 時代表只比對到症狀名稱 (symptom) 或分類關鍵字 (category，此時 symptom 為 None)
+Match = namedtuple('Match', 'symptom description plant score category', defaults=(None,))
+
+# 不計分的常見詞
+STOP_TERMS = frozenset((
+    '問題', '症狀', '狀況', '情況', '相關', '請問', '想問', '我想', '我有', '我的', '有點', '一直', '一點',
+    '一些', '感覺', '覺得', '好像', '最近', '常常', '經常', '容易', '時候', '有時', '什麼', '怎麼', '可以',
+    '應該', '需要', '建議', '推薦', '因為', '所以', '如果', '還是', '或是', '以及', '就是', '這個', '那個',
+    '現在', '今天', '非常', '比較', '沒有', '不是', '有沒', '沒什', '不會',
+))
+# 接在症狀名稱前面時代表否定 (「沒有失眠」、「不是高血壓」、「沒什麼咳嗽」)
+NEGATED = re.compile(r'(?:沒有|沒|不是|不會|不|無|非|未|別)(?:有|是|會|什麼|任何)?$')
+# 分類名稱裡不是關鍵字的部分
+CATEGORY_FILLER = re.compile('相關|問題')
+
+PLANT = 'plant'
+SYMPTOM = 'symptom'
+CATEGORY = 'category'
+
+
+def _bigrams(text):
+    text = normalize(text)
+    if len(text) < 2:
+        return Counter(text)
+    return Counter(text[i:i + 2] for i in range(len(text) - 1))
+
+
+def terms(text):
+    grams = _bigrams(text)
+    for t in STOP_TERMS.intersection(grams):
+        del grams[t]
+    return grams
+
+
+def category_keywords(name):
+    # 「呼吸系統與感冒相關」→ ['呼吸系統', '感冒']
+    return [k for k in CATEGORY_FILLER.sub('', name).split('與') if len(k) >= 2]
+
+
+class SymptomMatcher:
+    def __init__(self, index):
+        self.index = index
+        targets = []    # (symptom, description, plant, category)
+        docs = []
+        for d, (symptom, _, text) in enumerate(index.descriptions):
+            plant = index.description_plant[d]
+            if plant == NO_PLANT:
+                continue
+            targets.append((symptom, d, plant, None))
+            docs.append(terms(index.symptoms[symptom] + text))
+        # 問卷裡出現的症狀名稱：直接對應植物，或對應到該症狀的問卷 (沒有描述選項的症狀沒有問卷可以進入)
+        listed = {s for symptoms in index.category_symptoms for s in symptoms}
+        for symptom, plant in enumerate(index.symptom_plant):
+            if plant != NO_PLANT or symptom in listed and index.symptom_descriptions[symptom]:
+                targets.append((symptom, NO_PLANT, plant, None))
+                docs.append(terms(index.symptoms[symptom]))
+        self.mentions = set(index.symptoms)     # 檢查否定用
+        for category, name in enumerate(index.categories):
+            for keyword in category_keywords(name):
+                if keyword in index.symptom_ids:
+                    continue
+                targets.append((None, NO_PLANT, NO_PLANT, category))
+                docs.append(terms(keyword))
+                self.mentions.add(keyword)
+        # 長的先比對，「皮膚炎」不會只刪掉「皮膚」
+        self._mention_re = re.compile('|'.join(sorted(map(re.escape, self.mentions), key=len, reverse=True)))
+
+        df = Counter()
+        for doc in docs:
+            df.update(doc.keys())
+        n = len(docs)
+        self.idf = {t: math.log((n + 1) / (c + 1)) + 1 for t, c in df.items()}
+
+        self.targets = targets
+        # 比較不同種類的結果時，用文件涵蓋了查詢的多少 (cosine 偏好很短的症狀名稱文件)
+        self.doc_terms = [frozenset(doc) for doc in docs]
+        self.postings = {}   # bigram -> [(文件編號, 正規化後的權重)]
+        for i, doc in enumerate(docs):
+            weights = {t: tf * self.idf[t] for t, tf in doc.items()}
+            norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+            for t, w in weights.items():
+                self.postings.setdefault(t, []).append((i, w / norm))
+
+    def query_terms(self, text):
+        # 刪掉被否定的症狀名稱；刪掉的地方前後不組成 bigram
+        segments = []
+        start = 0
+        for m in self._mention_re.finditer(text):
+            if NEGATED.search(text, 0, m.start()):
+                segments.append(text[start:m.start()])
+                start = m.end()
+        segments.append(text[start:])
+        query = Counter()
+        for segment in segments:
+            query.update(terms(segment))
+        return query
+
+    def match(self, text, threshold=MATCH_THRESHOLD, plant_only=False):
+        # 回傳分數最高且超過門檻的 Match，否則回傳 None
+        # plant_only：只接受有對應植物的結果 (不能接著進行問卷時使用)
+        query = self.query_terms(text)
+        weights = {t: tf * self.idf[t] for t, tf in query.items() if t in self.idf}
+        if not weights:
+            return None
+        # 查詢向量的長度要把索引裡沒有的字也算進去，避免很長的無關句子因為一兩個字而高分
+        unknown = sum(tf for t, tf in query.items() if t not in self.idf)
+        norm = math.sqrt(sum(w * w for w in weights.values()) + unknown) or 1.0
+        scores = {}
+        for t, w in weights.items():
+            for i, dw in self.postings[t]:
+                scores[i] = scores.get(i, 0.0) + w * dw
+        total = sum(weights.values()) + unknown
+        # 各種類分數最高的文件：推薦植物、症狀名稱、分類關鍵字
+        best = {}
+        for i, score in scores.items():
+            kind = PLANT if self.targets[i][2] != NO_PLANT else SYMPTOM if self.targets[i][0] is not None else CATEGORY
+            if score / norm >= threshold and score > best.get(kind, (0.0, None))[0]:
+                best[kind] = (score, i)
+        chosen = best.get(PLANT)
+        if not plant_only:
+            # 只說了症狀名稱 (查詢完全被它涵蓋) 或症狀名稱涵蓋得比較多時，進入該症狀的問卷讓使用者選擇
+            symptom = best.get(SYMPTOM)
+            if symptom is not None:
+                covered = self._coverage(weights, total, symptom[1])
+                if chosen is None or covered >= 1 - 1e-9 or covered > self._coverage(weights, total, chosen[1]):
+                    chosen = symptom
+            # 分類關鍵字只在沒有更明確的結果時使用
+            if chosen is None:
+                chosen = best.get(CATEGORY)
+        if chosen is None:
+            return None
+        score, i = chosen
+        symptom, description, plant, category = self.targets[i]
+        return Match(symptom, description, plant, score / norm, category)
+
+    def _coverage(self, weights, total, i):
+        return sum(w for t, w in weights.items() if t in self.doc_terms[i]) / total
+
+
+_matcher = None
+
+
+def get_matcher():
+    global _matcher
+    if _matcher is None:
+        _matcher = SymptomMatcher(get_index())
+    return _matcher
@@ -0,0 +1,31 @@
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+# 測試直接 import 專案根目錄的模組 (python -m pytest 或 pytest 都可以)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# 索引快照、圖片快取、工作佇列都寫到暫存目錄，不動到專案目錄；也不啟動背景工作的執行緒
+_tmp = tempfile.mkdtemp(prefix='line-bot-test-')
+atexit.register(shutil.rmtree, _tmp, True)
+for name, filename in [('KNOWLEDGE_INDEX', 'knowledge.idx'), ('IMAGE_CACHE_DIR', 'image_cache'),
+                       ('IMAGE_VARIANT_DIR', 'image_variants'), ('JOB_QUEUE_DB', 'jobs.db')]:
+    os.environ.setdefault(name, os.path.join(_tmp, filename))
+os.environ.setdefault('JOB_WORKERS', '0')
+
+
+class FakeClock:
+    # 取代模組裡的 time：monotonic() 與 time() 都回傳手動推進的時間
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
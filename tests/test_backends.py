@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+from backends import make_backend, thread_connection
+
+
+def test_one_connection_per_thread(tmp_path):
+    conn = thread_connection(str(tmp_path / 'test.db'))
+    assert conn() is conn()
+    assert conn().execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    other = []
+    t = threading.Thread(target=lambda: other.append(conn()))
+    t.start()
+    t.join()
+    assert other[0] is not conn()
+
+
+def test_make_backend(monkeypatch, tmp_path):
+    memory = lambda: 'memory'
+    sqlite = lambda path: ('sqlite', path)
+    monkeypatch.delenv('TEST_BACKEND', raising=False)
+    assert make_backend('TEST', memory, sqlite, 'test.db') == 'memory'
+    monkeypatch.setenv('TEST_BACKEND', 'sqlite')
+    assert make_backend('TEST', memory, sqlite, 'test.db') == ('sqlite', 'test.db')
+    monkeypatch.setenv('TEST_DB', str(tmp_path / 'other.db'))
+    assert make_backend('TEST', memory, sqlite, 'test.db') == ('sqlite', str(tmp_path / 'other.db'))
+    monkeypatch.setenv('TEST_BACKEND', 'redis')
+    with pytest.raises(ValueError, match='unknown TEST_BACKEND: redis'):
+        make_backend('TEST', memory, sqlite, 'test.db')
@@ -0,0 +1,139 @@
+import pytest
+
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen
+from conftest import FakeClock
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker, 'time', clock)
+    return clock
+
+
+def make_breaker(**kwargs):
+    options = dict(slow_seconds=1, window=10, min_calls=4, error_rate=0.5, slow_rate=0.5, cooldown=30, probes=1)
+    options.update(kwargs)
+    return CircuitBreaker('test', **options)
+
+
+def fail(breaker):
+    with pytest.raises(ValueError):
+        with breaker.guard():
+            raise ValueError
+
+
+def succeed(breaker, clock=None, seconds=0):
+    with breaker.guard():
+        if clock is not None:
+            clock.advance(seconds)
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        fail(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_opens_on_error_rate(clock):
+    breaker = make_breaker()
+    succeed(breaker)
+    succeed(breaker)
+    fail(breaker)
+    assert breaker.state == CLOSED
+    fail(breaker)
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpen):
+        succeed(breaker)
+    assert not breaker.available()
+
+
+def test_opens_on_slow_calls(clock):
+    breaker = make_breaker()
+    for _ in range(2):
+        succeed(breaker)
+    for _ in range(2):
+        succeed(breaker, clock, 1.5)
+    assert breaker.state == OPEN
+
+
+def test_old_calls_leave_the_window(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        fail(breaker)
+    clock.advance(11)
+    for _ in range(3):
+        succeed(breaker)
+    fail(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        fail(breaker)
+    clock.advance(29)
+    assert not breaker.allow()
+    clock.advance(1)
+    assert breaker.available()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # 探測名額只有一個，進行中時其他呼叫仍然被擋下
+    assert not breaker.allow()
+    breaker.record(True, 0.1)
+    assert breaker.state == CLOSED
+    # 回到 closed 時舊的統計已清掉，單一次失敗不會馬上再 open
+    fail(breaker)
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        fail(breaker)
+    clock.advance(30)
+    fail(breaker)
+    assert breaker.state == OPEN
+    clock.advance(29)
+    with pytest.raises(CircuitOpen):
+        succeed(breaker)
+
+
+def test_slow_probe_reopens(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        fail(breaker)
+    clock.advance(30)
+    succeed(breaker, clock, 2)
+    assert breaker.state == OPEN
+
+
+def test_cancelled_probe_returns_its_slot(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        fail(breaker)
+    clock.advance(30)
+
+    def probe():
+        with breaker.guard():
+            yield
+
+    # 產生器在區塊內被關閉 (例如串流被中途放棄)：不算失敗，只歸還名額
+    gen = probe()
+    next(gen)
+    assert breaker.state == HALF_OPEN
+    gen.close()
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+
+
+def test_start_excludes_waiting_time(clock):
+    breaker = make_breaker()
+    for _ in range(4):
+        with breaker.guard() as call:
+            clock.advance(5)      # 例如等待並行名額
+            call.start()
+            clock.advance(0.1)
+    assert breaker.state == CLOSED
@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import pytest
+
+import conversation
+from conversation import NO_AI_TEXT, step, step_async
+from payloads import CATEGORY_ERROR, FREE_TEXT_PROMPT, MENU_TEXT
+from plant_cards import section_request
+
+
+def texts(messages):
+    # 每則訊息的文字 (Flex 用 altText，圖片用 'image')
+    out = []
+    for m in messages:
+        m = json.loads(m) if isinstance(m, bytes) else m
+        out.append(m.get('text') or m.get('altText') or m['type'])
+    return out
+
+
+def run(*inputs, ask_ai=None):
+    # 依序送出 inputs，回傳最後的狀態與每一步的回覆
+    state, replies = None, []
+    for text in inputs:
+        state, messages = step(state, text, ask_ai=ask_ai)
+        replies.append(texts(messages))
+    return state, replies
+
+
+def test_greeting_shows_menu():
+    state, [reply] = run('你好')
+    assert reply == [MENU_TEXT]
+    assert state['node'] == 0
+
+
+def test_questionnaire_to_plant():
+    state, replies = run('你好', 'A', '咳嗽', 'A')
+    assert replies[1][0].startswith('以下有符合您的症狀描述嗎?')
+    assert replies[2] == ['請選擇以下符合您的症狀描述:']
+    assert replies[3][1] == 'image'
+    assert state is None
+
+
+def test_lowercase_letters():
+    assert run('你好', 'a', '咳嗽', 'a')[1] == run('你好', 'A', '咳嗽', 'A')[1]
+
+
+def test_direct_exit_symptom():
+    state, replies = run('你好', 'A', '頭痛')
+    assert replies[2][0] == '薄荷'
+    assert state is None
+
+
+def test_invalid_input_keeps_the_step():
+    state, replies = run('你好', 'Q')
+    assert replies[1] == [CATEGORY_ERROR]
+    assert state['node'] == 0
+    state, replies = run('你好', 'A', '咳嗽', 'Z')
+    assert replies[3][0].startswith('輸入錯誤，請重新輸入(')
+    assert state is not None
+
+
+def test_free_text_uses_the_matcher_first():
+    asked = []
+    state, replies = run('你好', 'X', '頭痛', ask_ai=asked.append)
+    assert replies[1] == [FREE_TEXT_PROMPT]
+    assert replies[2][1] == '薄荷'
+    assert asked == []
+    assert state is None
+
+
+def test_free_text_falls_back_to_ai():
+    state, replies = run('你好', 'X', '我想問股票怎麼買', ask_ai=lambda text: 'AI:' + text)
+    assert replies[2] == ['AI:我想問股票怎麼買']
+    assert state is None
+    assert run('你好', 'X', '我想問股票怎麼買')[1][2] == [NO_AI_TEXT]
+
+
+def test_none_goes_to_free_text():
+    _, replies = run('你好', 'B', '沒有')
+    assert replies[2] == [FREE_TEXT_PROMPT]
+
+
+def test_unanswered_symptom_goes_to_free_text():
+    _, replies = run('你好', 'B', '食慾不振', '吃不下', ask_ai=lambda text: 'AI')
+    assert replies[2] == [FREE_TEXT_PROMPT]
+    assert replies[3] == ['AI']
+
+
+def test_clear_description_without_a_session():
+    state, [reply] = run('早上起床咳嗽很嚴重有痰')
+    assert reply[0].startswith('根據您的描述，較符合「咳嗽：')
+    assert state is None
+    # 只說症狀名稱時進入該症狀的問卷
+    state, [reply] = run('咳嗽')
+    assert reply == ['請選擇以下符合您的症狀描述:']
+    assert state is not None
+
+
+def test_restart_words():
+    state, replies = run('你好', 'A', '選單')
+    assert replies[2] == [MENU_TEXT]
+    assert state['node'] == 0
+
+
+def test_stale_state_restarts():
+    # 資料更新前存下的節點 ID 不再沿用
+    state, messages = step({'node': 3, 'v': 'old'}, 'A')
+    assert texts(messages) == [MENU_TEXT]
+    assert state['node'] == 0
+
+
+def test_section_request_keeps_the_step():
+    state, _ = run('你好', 'A')
+    new_state, messages = step(state, section_request('薄荷', '健康功效'))
+    assert new_state == state
+    assert len(messages) == 1
+
+
+def test_step_async_matches_step():
+    async def ask_ai(text):
+        return 'AI:' + text
+
+    async def run_async(*inputs):
+        state, replies = None, []
+        for text in inputs:
+            state, messages = await step_async(state, text, ask_ai=ask_ai)
+            replies.append(texts(messages))
+        return state, replies
+
+    for inputs in [('你好', 'A', '咳嗽', 'A'), ('你好', 'B', '胃痛'), ('你好', 'X', '我想問股票怎麼買'),
+                   ('你好', 'X', '選單'), ('你好', 'X', section_request('薄荷', '健康功效'))]:
+        expected = run(*inputs, ask_ai=lambda text: 'AI:' + text)
+        assert asyncio.run(run_async(*inputs)) == expected
+
+
+def test_busy_messages():
+    assert texts(conversation.busy_messages('我想問股票怎麼買')) == [conversation.BUSY_TEXT]
+    assert texts(conversation.busy_messages('頭痛', degrade=False)) == [conversation.BUSY_TEXT]
+    assert texts(conversation.busy_messages('頭痛'))[1] == '薄荷'
@@ -0,0 +1,107 @@
+from types import SimpleNamespace
+
+import pytest
+
+from decision_tree import CATEGORY, FREE_TEXT, PLANT, SYMPTOM, DecisionTree, TreeError, validate_tables
+from knowledge_index import KnowledgeIndex, compile_tables
+
+
+def tables(**changes):
+    data = dict(
+        Symptom_classification={'呼吸': ['咳嗽', '頭痛', '無'], '消化': ['胃痛', '無']},
+        Symptom_questions={
+            '咳嗽': {'A': '乾咳', 'B': '有痰'},
+            '胃痛': {'A': '飯後胃痛'},
+        },
+        Symptom_answers={'咳嗽_A': '薄荷', '咳嗽_B': '魚腥草', '胃痛_A': '紫蘇'},
+        direct_exit_symptoms=['頭痛'],
+        single_choice={'頭痛': '薄荷'},
+        image_url={'薄荷': 'https://example.com/1.jpg', '魚腥草': 'https://example.com/2.jpg',
+                   '紫蘇': 'https://example.com/3.jpg'},
+        valid_choices={'A': '呼吸', 'B': '消化', 'X': '退出'},
+    )
+    data.update(changes)
+    return SimpleNamespace(**data)
+
+
+def build(data):
+    index = KnowledgeIndex(compile_tables(data))
+    return index, DecisionTree(index, set(index.plants))
+
+
+def walk(tree, *inputs):
+    node_id = tree.root
+    for text in inputs:
+        node_id = tree.next(node_id, text)
+    return tree[node_id]
+
+
+def test_valid_tables():
+    assert validate_tables(tables()) == []
+
+
+@pytest.mark.parametrize('changes, message', [
+    (dict(valid_choices={'A': '呼吸', 'B': '循環'}), "unknown category '循環'"),
+    (dict(single_choice={}), "direct exit '頭痛' has no single_choice answer"),
+    (dict(Symptom_answers={'咳嗽_A': '薄荷', '咳嗽_B': '魚腥草', '胃痛_A': '紫蘇', '胃痛_C': '紫蘇'}),
+     "Symptom_answers['胃痛_C'] has no matching question"),
+    (dict(Symptom_answers={'咳嗽_A': '薄荷', '咳嗽_B': '艾草', '胃痛_A': '紫蘇'}), "plant '艾草' has no image_url"),
+    (dict(direct_exit_symptoms=['頭痛', '失眠'], single_choice={'頭痛': '薄荷', '失眠': '紫蘇'}),
+     "direct exit '失眠' is not listed in any category"),
+])
+def test_broken_references_are_errors(changes, message):
+    with pytest.raises(TreeError, match=message.replace('[', r'\[').replace(']', r'\]')):
+        validate_tables(tables(**changes))
+
+
+def test_missing_answers_are_warnings():
+    data = tables(Symptom_classification={'呼吸': ['咳嗽', '頭痛', '鼻塞', '無'], '消化': ['胃痛', '無']},
+                  Symptom_answers={'咳嗽_A': '薄荷', '胃痛_A': '紫蘇'})
+    warnings = validate_tables(data)
+    assert any("'鼻塞'" in w for w in warnings)
+    assert any('咳嗽_B' in w for w in warnings)
+
+
+def test_tree_edges():
+    index, tree = build(tables())
+    assert walk(tree, 'A').kind == CATEGORY
+    assert walk(tree, 'a') == walk(tree, 'A')
+    assert walk(tree, 'X').kind == FREE_TEXT
+    assert walk(tree, 'A', '沒有').kind == FREE_TEXT
+    assert walk(tree, 'A', '咳嗽').kind == SYMPTOM
+    leaf = walk(tree, 'A', '咳嗽', 'b')
+    assert leaf.kind == PLANT and index.plants[leaf.ref] == '魚腥草'
+    leaf = walk(tree, 'A', '頭痛')
+    assert leaf.kind == PLANT and index.plants[leaf.ref] == '薄荷'
+    assert tree.next(tree.root, 'Z') is None
+    # 同一株植物只有一個葉節點
+    assert tree.next(tree.category_nodes[0], '頭痛') == tree.next(tree.symptom_nodes[index.symptom_ids['咳嗽']], 'A')
+
+
+def test_unanswered_entries_go_to_free_text():
+    data = tables(Symptom_classification={'呼吸': ['咳嗽', '頭痛', '鼻塞', '無'], '消化': ['胃痛', '無']},
+                  Symptom_answers={'咳嗽_A': '薄荷', '胃痛_A': '紫蘇'})
+    _, tree = build(data)
+    assert walk(tree, 'A', '鼻塞').kind == FREE_TEXT
+    assert walk(tree, 'A', '咳嗽', 'B').kind == FREE_TEXT
+    assert walk(tree, 'A', '咳嗽', 'A').kind == PLANT
+
+
+def test_plants_need_monographs():
+    index = KnowledgeIndex(compile_tables(tables()))
+    with pytest.raises(TreeError, match='紫蘇'):
+        DecisionTree(index, {'薄荷', '魚腥草'})
+
+
+def test_shipped_data_keeps_unanswered_entries():
+    import plant_data
+    from decision_tree import get_tree
+    from knowledge_index import get_index
+    assert '食慾不振' in plant_data.Symptom_classification['消化與代謝問題']
+    assert 'K' in plant_data.Symptom_questions['消化不良']
+    tree = get_tree()
+    letter = next(k for k, v in plant_data.valid_choices.items() if v == '消化與代謝問題')
+    assert walk(tree, letter, '食慾不振').kind == FREE_TEXT
+    assert walk(tree, letter, '消化不良', 'K').kind == FREE_TEXT
+    assert walk(tree, letter, '消化不良', 'A').kind == PLANT
+    assert get_index().symptom_ids['食慾不振'] not in tree.symptom_nodes
@@ -0,0 +1,68 @@
+import pytest
+
+import gemini_cache
+from gemini_cache import ResponseCache, normalize
+from conftest import FakeClock
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(gemini_cache, 'time', clock)
+    return clock
+
+
+def test_normalize():
+    assert normalize('ＡＢＣ 頭痛，怎麼辦？') == 'abc頭痛怎麼辦'
+
+
+def test_exact_hit_ignores_punctuation_and_width():
+    cache = ResponseCache(similarity=1.1)
+    cache.put('頭很痛怎麼辦?', 'answer')
+    assert cache.get('頭很痛，怎麼辦？') == ('answer', 'exact')
+    assert cache.get('頭很痛') is None
+
+
+def test_similar_hit():
+    cache = ResponseCache(similarity=0.85)
+    cache.put('頭很痛又一直咳嗽該怎麼辦', 'answer')
+    assert cache.get('頭很痛又一直咳嗽該怎麼辦呢') == ('answer', 'similar')
+    assert cache.get('肚子很痛又一直拉肚子') is None
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ('有發燒咳嗽喉嚨痛該吃什麼', '沒有發燒咳嗽喉嚨痛該吃什麼'),     # 否定
+    ('我發燒咳嗽喉嚨痛該吃什麼藥', '我媽發燒咳嗽喉嚨痛該吃什麼藥'),   # 問的是別人
+])
+def test_guard_words_must_match(cached, asked):
+    cache = ResponseCache(similarity=0.5)
+    cache.put(cached, 'answer')
+    assert cache.get(asked) is None
+    assert cache.get(cached) == ('answer', 'exact')
+
+
+def test_length_must_be_close():
+    cache = ResponseCache(similarity=0.5)
+    cache.put('頭很痛又一直咳嗽', 'answer')
+    assert cache.get('頭很痛又一直咳嗽喉嚨也很痛很不舒服') is None
+
+
+def test_expiry(clock):
+    cache = ResponseCache(ttl=60, similarity=0.85)
+    cache.put('頭很痛又一直咳嗽該怎麼辦', 'answer')
+    clock.advance(59)
+    assert cache.get('頭很痛又一直咳嗽該怎麼辦呢') == ('answer', 'similar')
+    clock.advance(1)
+    assert cache.get('頭很痛又一直咳嗽該怎麼辦') is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted(clock):
+    cache = ResponseCache(max_entries=2, similarity=1.1)
+    cache.put('咳嗽', 'a')
+    cache.put('頭痛', 'b')
+    cache.get('咳嗽')
+    cache.put('失眠', 'c')
+    assert len(cache) == 2
+    assert cache.get('頭痛') is None
+    assert cache.get('咳嗽') == ('a', 'exact')
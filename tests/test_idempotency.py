@@ -0,0 +1,69 @@
+import pytest
+
+import idempotency
+from idempotency import MemoryEventSet, SQLiteEventSet
+from conftest import FakeClock
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(idempotency, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def events(request, tmp_path, clock):
+    if request.param == 'memory':
+        return MemoryEventSet(window=60)
+    return SQLiteEventSet(str(tmp_path / 'events.db'), window=60)
+
+
+def test_duplicate_within_window(events, clock):
+    assert events.add('e1')
+    assert not events.add('e1')
+    clock.advance(59)
+    assert not events.add('e1')
+    assert events.add('e2')
+
+
+def test_new_again_after_window(events, clock):
+    assert events.add('e1')
+    clock.advance(60)
+    assert events.add('e1')
+    assert not events.add('e1')
+
+
+def test_expired_events_are_dropped(clock):
+    events = MemoryEventSet(window=60)
+    events.add('e1')
+    clock.advance(30)
+    events.add('e2')
+    clock.advance(31)
+    events.add('e3')
+    assert len(events) == 2
+
+
+def test_max_events(clock):
+    events = MemoryEventSet(window=60, max_events=3)
+    for n in range(5):
+        assert events.add(f'e{n}')
+    assert len(events) == 3
+    # 被擠掉的最舊 event 會被當成新的
+    assert events.add('e0')
+    assert not events.add('e4')
+
+
+def test_sqlite_is_shared_between_instances(tmp_path, clock):
+    path = str(tmp_path / 'events.db')
+    assert SQLiteEventSet(path, window=60).add('e1')
+    assert not SQLiteEventSet(path, window=60).add('e1')
+
+
+def test_make_event_set(monkeypatch, tmp_path):
+    monkeypatch.setenv('IDEMPOTENCY_BACKEND', 'sqlite')
+    monkeypatch.setenv('IDEMPOTENCY_DB', str(tmp_path / 'events.db'))
+    assert isinstance(idempotency.make_event_set(), SQLiteEventSet)
+    monkeypatch.setenv('IDEMPOTENCY_BACKEND', 'redis')
+    with pytest.raises(ValueError):
+        idempotency.make_event_set()
@@ -0,0 +1,115 @@
+import pytest
+
+import job_queue
+from job_queue import JobQueue
+from conftest import FakeClock
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(job_queue, 'time', clock)
+    monkeypatch.setattr(job_queue.random, 'uniform', lambda a, b: 1.0)
+    return clock
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    # 註冊測試用的工作種類；fail 裡的次數用完之前每次都丟出例外
+    calls = {'ok': [], 'flaky': [], 'failed': []}
+    fail = {'left': 0}
+
+    def flaky(payload):
+        calls['flaky'].append(payload)
+        if fail['left']:
+            fail['left'] -= 1
+            raise RuntimeError('try again')
+
+    handlers = dict(job_queue._handlers)
+    handlers['ok'] = (calls['ok'].append, None)
+    handlers['flaky'] = (flaky, calls['failed'].append)
+    monkeypatch.setattr(job_queue, '_handlers', handlers)
+    calls['fail'] = fail
+    return calls
+
+
+@pytest.fixture
+def queue(tmp_path, clock, handled):
+    return JobQueue(str(tmp_path / 'jobs.db'), workers=0)
+
+
+def test_run_and_dedup(queue, handled):
+    assert queue.enqueue('ok', {'n': 1}, dedup_key='e1')
+    assert not queue.enqueue('ok', {'n': 2}, dedup_key='e1')
+    assert queue.run_one()
+    assert not queue.run_one()
+    assert handled['ok'] == [{'n': 1}]
+    assert queue.counts() == {'done': 1}
+
+
+def test_delay(queue, handled, clock):
+    queue.enqueue('ok', {'n': 1}, delay=10)
+    assert not queue.run_one()
+    clock.advance(10)
+    assert queue.run_one()
+
+
+def test_retry_with_backoff(queue, handled, clock, monkeypatch):
+    monkeypatch.setattr(job_queue, 'RETRY_BASE', 2)
+    handled['fail']['left'] = 2
+    queue.enqueue('flaky', {'n': 1})
+    assert queue.run_one()
+    assert queue.counts() == {'queued': 1}
+    assert not queue.run_one()
+    clock.advance(2)
+    assert queue.run_one()
+    clock.advance(3)
+    assert not queue.run_one()
+    clock.advance(1)        # 第二次重試等 4 秒
+    assert queue.run_one()
+    assert queue.counts() == {'done': 1}
+    assert len(handled['flaky']) == 3
+    assert handled['failed'] == []
+
+
+def test_gives_up_after_max_attempts(queue, handled, clock, monkeypatch):
+    monkeypatch.setattr(job_queue, 'MAX_ATTEMPTS', 2)
+    handled['fail']['left'] = 5
+    queue.enqueue('flaky', {'n': 1})
+    queue.run_one()
+    clock.advance(60)
+    queue.run_one()
+    assert queue.counts() == {'failed': 1}
+    assert handled['failed'] == [{'n': 1}]
+    clock.advance(60)
+    assert not queue.run_one()
+
+
+def test_lease_reclaim(tmp_path, queue, handled, clock, monkeypatch):
+    monkeypatch.setattr(job_queue, 'LEASE', 300)
+    queue.enqueue('ok', {'n': 1})
+    # 領取之後行程就當掉了，工作停在 running
+    assert queue._claim() is not None
+    other = JobQueue(str(tmp_path / 'jobs.db'), workers=0)
+    clock.advance(299)
+    assert not other.run_one()
+    clock.advance(2)
+    assert other.run_one()
+    assert handled['ok'] == [{'n': 1}]
+    assert other.counts() == {'done': 1}
+
+
+def test_only_registered_kinds_are_claimed(queue, handled):
+    queue.enqueue('other_process_kind', {'n': 1})
+    assert not queue.run_one()
+    assert queue.counts() == {'queued': 1}
+
+
+def test_cleanup_keeps_recent_jobs(queue, clock):
+    queue.enqueue('ok', {'n': 1}, dedup_key='e1')
+    queue.run_one()
+    queue.cleanup()
+    assert not queue.enqueue('ok', {'n': 1}, dedup_key='e1')
+    clock.advance(job_queue.KEEP_DONE + 1)
+    queue.cleanup()
+    assert queue.enqueue('ok', {'n': 1}, dedup_key='e1')
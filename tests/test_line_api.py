@@ -0,0 +1,75 @@
+import json
+
+import line_api
+from idempotency import MemoryEventSet
+from line_api import MAX_MESSAGES, MAX_TEXT, RawMessage, encode_body, pack_messages
+
+
+def text(s, **extra):
+    return {'type': 'text', 'text': s, **extra}
+
+
+def image(n):
+    return {'type': 'image', 'originalContentUrl': f'https://example.com/{n}.jpg',
+            'previewImageUrl': f'https://example.com/{n}.jpg'}
+
+
+def test_adjacent_texts_are_merged():
+    assert pack_messages([text('a'), text('b'), image(1), text('c')]) == [
+        [text('a\nb'), image(1), text('c')]]
+
+
+def test_batches_of_five():
+    messages = [image(n) for n in range(12)]
+    batches = pack_messages(messages)
+    assert [len(b) for b in batches] == [MAX_MESSAGES, MAX_MESSAGES, 2]
+    assert [m for b in batches for m in b] == messages
+
+
+def test_merge_stops_at_max_text():
+    a = 'a' * (MAX_TEXT - 10)
+    batches = pack_messages([text(a), text('b' * 9), text('c' * 10)])
+    assert batches == [[text(a + '\n' + 'b' * 9), text('c' * 10)]]
+    assert all(len(m['text']) <= MAX_TEXT for m in batches[0])
+
+
+def test_long_text_is_split_at_newlines():
+    lines = ['x' * 999] * 12       # 每行加上換行剛好 1000 字
+    packed = pack_messages([text('\n'.join(lines))])[0]
+    assert [len(m['text']) for m in packed] == [4999, 4999, 1999]
+    assert '\n'.join(m['text'] for m in packed) == '\n'.join(lines)
+
+
+def test_long_text_without_newlines_is_hard_split():
+    packed = pack_messages([text('y' * (MAX_TEXT * 2 + 1))])[0]
+    assert [len(m['text']) for m in packed] == [MAX_TEXT, MAX_TEXT, 1]
+
+
+def test_quick_reply_is_kept_last():
+    quick = {'items': []}
+    batches = pack_messages([text('question', quickReply=quick), text('more')])
+    assert batches == [[text('question', quickReply=quick), text('more')]]
+    batches = pack_messages([text('intro'), text('question', quickReply=quick)])
+    assert batches == [[text('intro\nquestion', quickReply=quick)]]
+
+
+def test_raw_messages_pass_through():
+    raw = RawMessage(b'{"type":"text","text":"raw"}')
+    batches = pack_messages([text('a'), raw, text('b')])
+    assert batches == [[text('a'), raw, text('b')]]
+
+
+def test_encode_body():
+    raw = RawMessage(b'{"type":"text","text":"raw"}')
+    body = encode_body({'replyToken': 't'}, [text('中文'), raw])
+    assert json.loads(body) == {'replyToken': 't', 'messages': [text('中文'), text('raw')]}
+
+
+def test_first_delivery_dedups_by_event_id():
+    seen = MemoryEventSet()
+    event = {'webhookEventId': 'e1', 'deliveryContext': {'isRedelivery': True}}
+    assert line_api.first_delivery(event, seen)
+    assert not line_api.first_delivery(event, seen)
+    # 沒有 webhookEventId 的 event 一律處理
+    assert line_api.first_delivery({}, seen)
+    assert line_api.first_delivery({}, seen)
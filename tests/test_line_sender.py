@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from line_api import LineSender
+
+
+class Stub:
+    # 依序回傳預先排好的回應 (狀態碼, headers)，記錄收到的請求
+    def __init__(self):
+        self.responses = []
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.requests.append((self.path, dict(self.headers), body, time.monotonic()))
+                status, headers = stub.responses.pop(0) if stub.responses else (200, {})
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+
+    def paths(self):
+        return [path for path, _, _, _ in self.requests]
+
+
+@pytest.fixture(scope='module')
+def server():
+    stub = Stub()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+@pytest.fixture
+def stub(server):
+    server.responses = []
+    server.requests = []
+    return server
+
+
+def sender(stub, max_retries=2):
+    return LineSender(base_url=stub.url, access_token='token', max_retries=max_retries)
+
+
+def text(n):
+    return {'type': 'text', 'text': f'm{n}', 'quickReply': {'items': []}}
+
+
+def test_retry_after_429(stub):
+    stub.responses = [(429, {'Retry-After': '0.2'}), (200, {})]
+    assert sender(stub).reply('t', [text(1)])
+    assert stub.paths() == ['/v2/bot/message/reply'] * 2
+    assert stub.requests[1][3] - stub.requests[0][3] >= 0.2
+
+
+def test_429_holds_back_other_calls(stub):
+    stub.responses = [(429, {'Retry-After': '0.3'})]
+    line = sender(stub)
+    line.push('U1', [text(1)])
+    start = time.monotonic()
+    line.push('U2', [text(2)])
+    assert time.monotonic() - start < 0.2      # 第一個 push 已經等過了
+    assert stub.requests[1][3] - stub.requests[0][3] >= 0.3
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.responses = [(500, {'Retry-After': '0'})] * 3
+    line = sender(stub, max_retries=2)
+    with pytest.raises(Exception):
+        line.push('U1', [text(1)])
+    assert len(stub.requests) == 3
+
+
+def test_reply_sends_extra_batches_by_push(stub):
+    line = sender(stub)
+    assert line.reply('t', [text(n) for n in range(7)], 'U1')
+    assert stub.paths() == ['/v2/bot/message/reply', '/v2/bot/message/push']
+    assert len(stub.requests[0][2]['messages']) == 5
+    assert stub.requests[1][2] == {'to': 'U1', 'messages': [text(5), text(6)]}
+
+
+def test_failed_reply_falls_back_to_push(stub):
+    stub.responses = [(400, {})]
+    assert sender(stub).reply('expired', [text(1)], 'U1')
+    assert stub.paths() == ['/v2/bot/message/reply', '/v2/bot/message/push']
+    assert stub.requests[1][2]['messages'] == [text(1)]
+
+
+def test_failed_reply_without_user(stub):
+    stub.responses = [(400, {})]
+    assert not sender(stub).reply('expired', [text(1)])
+    assert stub.paths() == ['/v2/bot/message/reply']
+
+
+def test_failed_fallback_push(stub):
+    stub.responses = [(400, {}), (403, {})]
+    assert not sender(stub).reply('expired', [text(1)], 'U1')
+
+
+def test_push_retry_keys(stub):
+    line = sender(stub)
+    key = '0b9e6a3c-2f4b-4c1e-9d0a-6b7c8d9e0f1a'
+    line.push('U1', [text(n) for n in range(7)], retry_key=key)
+    keys = [headers['X-Line-Retry-Key'] for _, headers, _, _ in stub.requests]
+    assert keys[0] == key and keys[1] != key
+    # 409：同一個 retry key 已經送出過，不算失敗
+    stub.responses = [(409, {}), (409, {})]
+    line.push('U1', [text(n) for n in range(7)], retry_key=key)
+    assert [headers['X-Line-Retry-Key'] for _, headers, _, _ in stub.requests[2:]] == keys
@@ -0,0 +1,22 @@
+import json
+
+from payloads import CATEGORY_ERROR_NODE, MENU, get_payloads
+
+
+def labels(key):
+    message = json.loads(get_payloads()[key])
+    return {item['action']['text']: item['action']['label'] for item in message['quickReply']['items']}
+
+
+def test_menu_buttons():
+    for key in (MENU, CATEGORY_ERROR_NODE):
+        buttons = labels(key)
+        assert list(buttons) == ['A', 'B', 'C', 'D', 'E', 'X']
+        # X 是改用自由描述，不是離開
+        assert buttons['X'] == 'X: 以上都不符合'
+
+
+def test_nodes_are_pre_encoded():
+    payloads = get_payloads()
+    assert len(payloads.version) == 12
+    assert payloads[MENU].startswith(b'{"type":"text"')
@@ -0,0 +1,101 @@
+import pytest
+
+import rate_limit
+from rate_limit import ALLOW, DEGRADE, QUEUE, REFUSE, MemoryLedger, RateLimiter, TokenBucket
+from conftest import FakeClock
+
+
+def test_burst_then_one_per_interval():
+    bucket = TokenBucket(per_minute=60, burst=3)
+    now = 100.0
+    for _ in range(3):
+        wait, tat = bucket.wait('u', now)
+        assert wait <= 0
+        bucket.commit('u', tat)
+    wait, tat = bucket.wait('u', now)
+    assert wait == pytest.approx(1)
+    # 沒有 commit 的檢查不佔名額
+    assert bucket.wait('u', now)[0] == pytest.approx(1)
+    # 過了一個間隔就多一個名額
+    assert bucket.wait('u', now + 1)[0] <= 0
+
+
+def test_idle_key_refills_to_burst():
+    bucket = TokenBucket(per_minute=30, burst=2)
+    for _ in range(2):
+        bucket.commit('u', bucket.wait('u', 0.0)[1])
+    assert bucket.wait('u', 0.0)[0] == pytest.approx(2)
+    # 閒置很久之後 TAT 從現在算起，不會累積超過 burst 的名額
+    for _ in range(2):
+        wait, tat = bucket.wait('u', 1000.0)
+        assert wait <= 0
+        bucket.commit('u', tat)
+    assert bucket.wait('u', 1000.0)[0] > 0
+
+
+def test_keys_are_independent():
+    bucket = TokenBucket(per_minute=60, burst=1)
+    bucket.commit('a', bucket.wait('a', 0.0)[1])
+    assert bucket.wait('a', 0.0)[0] > 0
+    assert bucket.wait('b', 0.0)[0] <= 0
+
+
+def test_sweep_drops_expired_keys(monkeypatch):
+    clock = FakeClock(0.0)
+    monkeypatch.setattr(rate_limit, 'time', clock)
+    bucket = TokenBucket(per_minute=60, burst=1)
+    bucket.commit('a', 1.0)
+    bucket.commit('b', 50.0)
+    clock.advance(10)
+    bucket._sweep()
+    assert len(bucket) == 1
+
+
+@pytest.fixture
+def limiter(monkeypatch):
+    monkeypatch.setattr(rate_limit, 'USER_PER_MIN', 60)
+    monkeypatch.setattr(rate_limit, 'USER_BURST', 1)
+    monkeypatch.setattr(rate_limit, 'GLOBAL_PER_MIN', 600)
+    monkeypatch.setattr(rate_limit, 'GLOBAL_BURST', 100)
+    monkeypatch.setattr(rate_limit, 'DAILY_CALLS', 0)
+    monkeypatch.setattr(rate_limit, 'DAILY_TOKENS', 0)
+
+    def make(policy, max_wait=60):
+        return RateLimiter(MemoryLedger(), policy=policy, max_wait=max_wait)
+    return make
+
+
+def test_queue_policy_reserves_a_slot(limiter):
+    rl = limiter(QUEUE)
+    assert rl.admit('u') == (ALLOW, 0)
+    action, wait = rl.admit('u')
+    assert action == QUEUE
+    assert 0 < wait <= 1
+    # 排隊的請求已經佔了下一個名額
+    assert rl.admit('u')[1] > wait
+
+
+def test_queue_degrades_when_wait_too_long(limiter):
+    rl = limiter(QUEUE, max_wait=0.5)
+    rl.admit('u')
+    assert rl.admit('u') == (DEGRADE, 0)
+
+
+@pytest.mark.parametrize('policy', [DEGRADE, REFUSE])
+def test_overflow_policies(limiter, policy):
+    rl = limiter(policy)
+    assert rl.admit('u') == (ALLOW, 0)
+    assert rl.admit('u') == (policy, 0)
+    assert rl.admit('other') == (ALLOW, 0)
+
+
+def test_daily_quota(limiter, monkeypatch):
+    monkeypatch.setattr(rate_limit, 'DAILY_CALLS', 2)
+    rl = limiter(QUEUE)
+    rl.ledger.record(calls=2)
+    assert rl.admit('u') == (DEGRADE, 0)
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        RateLimiter(MemoryLedger(), policy='drop')
@@ -0,0 +1,91 @@
+import pytest
+
+import session_store
+from session_store import MemorySessionStore, SQLiteSessionStore
+from conftest import FakeClock
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def make_store(request, tmp_path, clock):
+    def make(ttl=60, max_sessions=100):
+        if request.param == 'memory':
+            return MemorySessionStore(ttl=ttl, max_sessions=max_sessions)
+        return SQLiteSessionStore(str(tmp_path / 'sessions.db'), ttl=ttl, max_sessions=max_sessions)
+    return make
+
+
+def test_set_get_delete(make_store):
+    store = make_store()
+    assert store.get('U1') is None
+    store.set('U1', {'node': 3, 'v': 'abc'})
+    assert store.get('U1') == {'node': 3, 'v': 'abc'}
+    store.set('U1', {'node': 4, 'v': 'abc'})
+    assert store.get('U1') == {'node': 4, 'v': 'abc'}
+    store.delete('U1')
+    assert store.get('U1') is None
+    store.delete('U1')
+
+
+def test_idle_sessions_expire(make_store, clock):
+    store = make_store(ttl=60)
+    store.set('U1', {'node': 1})
+    clock.advance(59)
+    assert store.get('U1') == {'node': 1}
+    clock.advance(1)
+    assert store.get('U1') is None
+
+
+def test_set_refreshes_ttl(make_store, clock):
+    store = make_store(ttl=60)
+    store.set('U1', {'node': 1})
+    clock.advance(40)
+    store.set('U1', {'node': 2})
+    clock.advance(40)
+    assert store.get('U1') == {'node': 2}
+
+
+def test_sweep(make_store, clock):
+    store = make_store(ttl=60)
+    store.set('U1', {'node': 1})
+    clock.advance(30)
+    store.set('U2', {'node': 1})
+    clock.advance(30)
+    assert store.sweep() == 1
+    assert len(store) == 1
+    assert store.get('U2') == {'node': 1}
+
+
+def test_least_recently_written_is_dropped(make_store, clock):
+    store = make_store(max_sessions=2)
+    for user in ('U1', 'U2'):
+        store.set(user, {'node': 1})
+        clock.advance(1)
+    store.set('U1', {'node': 2})
+    clock.advance(1)
+    store.set('U3', {'node': 1})
+    store.sweep()
+    assert len(store) == 2
+    assert store.get('U2') is None
+    assert store.get('U1') == {'node': 2}
+    assert store.get('U3') == {'node': 1}
+
+
+def test_sqlite_survives_restart(tmp_path, clock):
+    path = str(tmp_path / 'sessions.db')
+    SQLiteSessionStore(path).set('U1', {'node': 5})
+    assert SQLiteSessionStore(path).get('U1') == {'node': 5}
+
+
+def test_make_session_store(monkeypatch, tmp_path):
+    monkeypatch.setenv('SESSION_BACKEND', 'sqlite')
+    monkeypatch.setenv('SESSION_DB', str(tmp_path / 'sessions.db'))
+    assert isinstance(session_store.make_session_store(), SQLiteSessionStore)
+    monkeypatch.setenv('SESSION_BACKEND', 'memory')
+    assert isinstance(session_store.make_session_store(), MemorySessionStore)
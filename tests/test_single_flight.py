@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+import pytest
+
+from single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_do_shares_one_call():
+    flight = SingleFlight('test')
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch(key):
+        calls.append(key)
+        started.set()
+        release.wait(5)
+        return key.upper()
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do('k', fetch, 'k')))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do('k', fetch, 'k'))) for _ in range(3)]
+    for t in followers:
+        t.start()
+    release.set()
+    for t in [leader] + followers:
+        t.join(5)
+    assert calls == ['k']
+    assert results == ['K'] * 4
+    assert len(flight) == 0
+
+
+def test_do_error_is_not_cached():
+    flight = SingleFlight('test')
+
+    def boom():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        flight.do('k', boom)
+    assert flight.do('k', lambda: 1) == 1
+
+
+def test_stream_replays_from_the_start():
+    flight = SingleFlight('test')
+    release = threading.Event()
+
+    def pieces():
+        yield 'a'
+        release.wait(5)
+        yield 'b'
+
+    first = flight.stream('k', pieces)
+    assert next(first) == 'a'
+    second = flight.stream('k', pieces)
+    release.set()
+    assert list(first) == ['b']
+    assert list(second) == ['a', 'b']
+
+
+def test_stream_error_reaches_every_reader():
+    flight = SingleFlight('test')
+
+    def pieces():
+        yield 'a'
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        list(flight.stream('k', pieces))
+
+
+def test_async_do_shares_one_call():
+    flight = AsyncSingleFlight('test')
+    calls = []
+
+    async def fetch(key):
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return key.upper()
+
+    async def main():
+        return await asyncio.gather(*[flight.do('k', fetch, 'k') for _ in range(4)])
+
+    assert asyncio.run(main()) == ['K'] * 4
+    assert calls == ['k']
+
+
+def test_async_cancelled_waiter_does_not_cancel_the_call():
+    flight = AsyncSingleFlight('test')
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        return 'done'
+
+    async def main():
+        first = asyncio.ensure_future(flight.do('k', fetch))
+        second = asyncio.ensure_future(flight.do('k', fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == 'done'
+
+
+def test_async_stream_replays_from_the_start():
+    flight = AsyncSingleFlight('test')
+
+    async def pieces():
+        for piece in 'abc':
+            await asyncio.sleep(0)
+            yield piece
+
+    async def read(it):
+        return [piece async for piece in it]
+
+    async def main():
+        return await asyncio.gather(read(flight.stream('k', pieces)), read(flight.stream('k', pieces)))
+
+    assert asyncio.run(main()) == [['a', 'b', 'c'], ['a', 'b', 'c']]
@@ -0,0 +1,42 @@
+import pytest
+
+import gemini_client
+import rate_limit
+import slow_replies
+
+
+class Queue:
+    def __init__(self):
+        self.jobs = []
+
+    def enqueue(self, kind, payload, dedup_key=None, delay=0):
+        self.jobs.append((kind, payload['text'], dedup_key, delay))
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    queue = Queue()
+    monkeypatch.setattr(slow_replies, 'get_queue', lambda: queue)
+    return queue
+
+
+def test_cached_answer_goes_into_the_reply(queue, monkeypatch):
+    monkeypatch.setattr(gemini_client, 'cached_answer', lambda text: '多喝水')
+    assert slow_replies.deferred_ai('U1', 'e1')('喉嚨痛') == '多喝水'
+    assert queue.jobs == []
+
+
+def test_uncached_question_is_queued(queue, monkeypatch):
+    monkeypatch.setattr(gemini_client, 'cached_answer', lambda text: None)
+    monkeypatch.setattr(gemini_client, 'available', lambda: True)
+    monkeypatch.setattr(rate_limit.get_limiter(), 'admit', lambda user_id: (rate_limit.ALLOW, 0))
+    assert slow_replies.deferred_ai('U1', 'e1')('喉嚨痛') == slow_replies.THINKING_TEXT
+    assert queue.jobs == [('ai_answer', '喉嚨痛', 'ai_answer:e1', 0)]
+
+
+def test_open_breaker_answers_locally(queue, monkeypatch):
+    monkeypatch.setattr(gemini_client, 'cached_answer', lambda text: None)
+    monkeypatch.setattr(gemini_client, 'available', lambda: False)
+    messages = slow_replies.deferred_ai('U1', 'e1')('我想問股票')
+    assert messages[-1]['text'] == slow_replies.UNAVAILABLE_TEXT
+    assert queue.jobs == []
@@ -0,0 +1,67 @@
+import uuid
+
+from streaming import SentenceBuffer, part_key
+
+
+def feed_all(buffer, pieces):
+    parts = []
+    for piece in pieces:
+        parts += buffer.feed(piece)
+    last = buffer.flush()
+    if last:
+        parts.append(last)
+    return parts
+
+
+def test_first_part_is_sent_at_first_sentence_end():
+    buffer = SentenceBuffer(first_chars=5, min_chars=20, max_parts=3)
+    assert buffer.feed('葉子變黃') == []
+    assert buffer.feed('通常是缺水。另外') == ['葉子變黃通常是缺水。']
+    assert buffer.text == '另外'
+
+
+def test_short_first_sentence_waits():
+    buffer = SentenceBuffer(first_chars=5, min_chars=20, max_parts=3)
+    assert buffer.feed('好。') == []
+    assert buffer.feed('葉子變黃通常是缺水。') == ['好。葉子變黃通常是缺水。']
+
+
+def test_later_parts_need_min_chars():
+    buffer = SentenceBuffer(first_chars=1, min_chars=20, max_parts=5)
+    assert buffer.feed('第一句。') == ['第一句。']
+    assert buffer.feed('短句。') == []
+    assert buffer.feed('再一句。') == []
+    assert buffer.feed('這一句讓累積的文字超過二十個字了。尾巴') == [
+        '短句。再一句。這一句讓累積的文字超過二十個字了。']
+    assert buffer.flush() == '尾巴'
+
+
+def test_cut_at_last_sentence_end():
+    buffer = SentenceBuffer(first_chars=1, min_chars=1, max_parts=3)
+    assert buffer.feed('一。二！三') == ['一。二！']
+
+
+def test_max_parts_leaves_the_rest_to_flush():
+    buffer = SentenceBuffer(first_chars=1, min_chars=1, max_parts=3)
+    parts = feed_all(buffer, ['一。', '二。', '三。', '四。', '五。'])
+    assert parts == ['一。', '二。', '三。四。五。']
+    assert buffer.parts == 3
+
+
+def test_no_sentence_end_goes_out_on_flush():
+    buffer = SentenceBuffer(first_chars=1, min_chars=1, max_parts=3)
+    assert feed_all(buffer, ['沒有', '句號']) == ['沒有句號']
+
+
+def test_blank_text_is_not_a_part():
+    buffer = SentenceBuffer(first_chars=1, min_chars=1, max_parts=3)
+    assert buffer.feed('\n\n') == []
+    assert buffer.flush() == ''
+    assert buffer.parts == 0
+
+
+def test_part_key_is_stable_per_part():
+    key = str(uuid.uuid4())
+    assert part_key(key, 1) == part_key(key, 1)
+    assert part_key(key, 1) != part_key(key, 2)
+    assert part_key(key, 1) != part_key(str(uuid.uuid4()), 1)
@@ -0,0 +1,69 @@
+import pytest
+
+from knowledge_index import NO_PLANT, get_index
+from symptom_matcher import category_keywords, get_matcher, terms
+
+
+def describe(match):
+    index = get_index()
+    if match is None:
+        return None
+    symptom = index.symptoms[match.symptom] if match.symptom is not None else None
+    plant = index.plants[match.plant] if match.plant != NO_PLANT else None
+    category = index.categories[match.category] if match.category is not None else None
+    return symptom, plant, category
+
+
+@pytest.mark.parametrize('text', ['咳嗽', '失眠', '高血壓', '消化不良', '皮膚炎'])
+def test_bare_symptom_name_opens_its_questionnaire(text):
+    match = get_matcher().match(text)
+    assert describe(match) == (text, None, None)
+    assert match.score == pytest.approx(1.0)
+
+
+def test_direct_exit_symptom_recommends_its_plant():
+    assert describe(get_matcher().match('頭痛')) == ('頭痛', '薄荷', None)
+    assert describe(get_matcher().match('最近不太舒服頭痛')) == ('頭痛', '薄荷', None)
+
+
+def test_description_recommends_a_plant():
+    assert describe(get_matcher().match('早上起床咳嗽很嚴重有痰')) == ('咳嗽', '山芙蓉', None)
+
+
+def test_category_keyword():
+    assert describe(get_matcher().match('呼吸系統')) == (None, None, '呼吸系統與感冒相關')
+
+
+@pytest.mark.parametrize('text', ['沒有失眠問題', '我不是高血壓', '沒什麼咳嗽'])
+def test_negated_symptoms_do_not_match(text):
+    assert get_matcher().match(text) is None
+
+
+def test_negation_only_removes_the_negated_symptom():
+    assert describe(get_matcher().match('我沒有發燒但咳嗽有痰'))[0] == '咳嗽'
+    query = get_matcher().query_terms('沒有發燒但咳嗽')
+    assert '發燒' not in query and '咳嗽' in query
+    # 刪掉的地方前後不組成 bigram
+    assert '但咳' in query and '燒但' not in query
+
+
+@pytest.mark.parametrize('text', ['我想問股票怎麼買', '沒什麼問題', '今天天氣很好'])
+def test_unrelated_text_goes_to_gemini(text):
+    assert get_matcher().match(text) is None
+
+
+def test_plant_only():
+    # 不能接著進行問卷時 (例如 Gemini 忙碌中的替代回答)，只有症狀名稱不夠
+    assert get_matcher().match('咳嗽', plant_only=True) is None
+    match = get_matcher().match('早上起床咳嗽很嚴重有痰', plant_only=True)
+    assert describe(match) == ('咳嗽', '山芙蓉', None)
+
+
+def test_symptoms_without_questionnaire_are_not_targets():
+    # 沒有問題也沒有直接答案的症狀交給 Gemini
+    assert get_matcher().match('食慾不振') is None
+
+
+def test_terms():
+    assert terms('我有咳嗽問題') == {'有咳': 1, '咳嗽': 1, '嗽問': 1}
+    assert category_keywords('呼吸系統與感冒相關') == ['呼吸系統', '感冒']